@@ -1,9 +1,21 @@
 import os
 import json
 import sys
+import shlex
 import shutil
-import zipfile
-import requests
+
+from . import plan
+from . import catalog
+from . import artifacts
+from . import release
+from . import installer
+from . import manifest
+from . import net
+from . import envstore
+from . import daemon
+from . import errors
+from . import resolver
+from . import freeze
 
 
 class CmdArg:
@@ -21,28 +33,32 @@ class CmdArg:
     def OnError(self, error):
         self.error = error
 
-    def Execute(self):
-        for i in range(len(self.cmdArgs)):
-            arg = self.cmdArgs[i]
-            if arg not in self.bindArgs:
-                continue
-            if (
-                self.cmdArgs[i] == self.cmdArgs[-1]
-                or self.cmdArgs[i + 1] in self.bindArgs
-            ):
-                value = ""
-            else:
-                value = self.cmdArgs[i + 1]
-            self.bindArgObjs[arg](value)
-            self.errorFlag = False
-        if self.errorFlag:
-            print(self.error)
-            exit(1)
+    def Execute(self, cmdArgs: list[str] | None = None):
+        parentArgs = self.cmdArgs
+        if cmdArgs is not None:
+            self.cmdArgs = cmdArgs
+        self.errorFlag = True
+        try:
+            for i in range(len(cmdArgs := self.cmdArgs)):
+                arg = cmdArgs[i]
+                if arg not in self.bindArgs:
+                    continue
+                if cmdArgs[i] == cmdArgs[-1] or cmdArgs[i + 1] in self.bindArgs:
+                    value = ""
+                else:
+                    value = cmdArgs[i + 1]
+                self.bindArgObjs[arg](value)
+                self.errorFlag = False
+            if self.errorFlag:
+                print(self.error)
+                exit(1)
+        finally:
+            self.cmdArgs = parentArgs
 
 
 def compare_versions(version1: str, version2: str) -> int:
-    v1 = list(map(int, version1.split(".")))
-    v2 = list(map(int, version2.split(".")))
+    v1 = catalog.parse_version(version1)
+    v2 = catalog.parse_version(version2)
     for i in range(max(len(v1), len(v2))):
         num1 = v1[i] if i < len(v1) else 0
         num2 = v2[i] if i < len(v2) else 0
@@ -54,38 +70,44 @@ def compare_versions(version1: str, version2: str) -> int:
 
 
 sdkModulePath = os.path.join(os.path.dirname(__file__), "modules")
-sys.path.append(sdkModulePath)
 CmdArg = CmdArg()
 
 
+def isOffline() -> bool:
+    return "-offline" in CmdArg.cmdArgs
+
+
+def withOptional() -> bool:
+    return "-with-optional" in CmdArg.cmdArgs
+
+
 # For Env
-def checkEnvFile():
-    if not os.path.exists("./env.json"):
-        with open("./env.json", "w") as f:
-            f.write("{}")
+envStores: dict[str, envstore.EnvStore] = {}
 
 
-def getEnvFile():
-    with open("./env.json", "r") as f:
-        return json.load(f)
+def getEnvStore():
+    envFile = os.path.abspath("./env.json")
+    if envFile not in envStores:
+        envStores[envFile] = envstore.EnvStore(envFile, poll=None, flushDelay=None)
+    else:
+        envStores[envFile].reload()
+    return envStores[envFile]
 
 
-def writeEnvFile(envObj):
-    with open("./env.json", "w") as f:
-        json.dump(envObj, f, indent=2)
+def flushEnv():
+    for store in envStores.values():
+        store.flush()
 
 
 def getEnv(value):
-    checkEnvFile()
-    print(getEnvFile().get(value, None))
+    print(getEnvStore().get(value, None))
 
 
 CmdArg.Bind("-get-env", getEnv)
 
 
 def listEnv(value):
-    checkEnvFile()
-    for key, value in getEnvFile().items():
+    for key, value in getEnvStore().items():
         print(key, "->", value)
 
 
@@ -93,9 +115,7 @@ CmdArg.Bind("-list-env", listEnv)
 
 
 def setEnv(value):
-    checkEnvFile()
-    k = value.split("=")[0]
-    v = value.split("=")[1]
+    k, _, v = value.partition("=")
     if ":" in v:
         v_type = v.split(":")[0]
         v = ':'.join(v.split(":")[1:])
@@ -118,17 +138,14 @@ def setEnv(value):
     else:
         print(f"Invalid type {v_type}")
         exit(1)
-    writeEnvFile({**getEnvFile(), **{k: v}})
+    getEnvStore().set(k, v)
 
 
 CmdArg.Bind("-set-env", setEnv)
 
 
 def delEnv(value):
-    checkEnvFile()
-    origin_env = getEnvFile()
-    del origin_env[value]
-    writeEnvFile(origin_env)
+    getEnvStore().delete(value)
 
 
 CmdArg.Bind("-del-env", delEnv)
@@ -166,16 +183,46 @@ def updateOrigin(value):
     checkModuleFile()
     moduleObj = getModuleFile()
     origins = moduleObj["origins"]
+    originCache = moduleObj.get("originCache", {})
+    cachedProviders = moduleObj.get("providers", {})
+    cachedModules = moduleObj.get("modules", {})
+    results = net.fetch_origins(origins, originCache)
     moduleObj["providers"] = {}
     moduleObj["modules"] = {}
+    moduleObj["originCache"] = {}
+    changed = set(originCache.keys()) != set(origins)
     for origin in origins:
-        print(f"Fetch {origin}")
-        content = requests.get(origin, headers={"User-Agent": "SDK Frame CLI"}).json()
-        moduleObj["providers"][content["name"]] = content["base"]
-        for module in list(content["modules"].keys()):
-            moduleContent = content["modules"][module]
-            moduleObj["modules"][f'{module}@{content["name"]}'] = moduleContent
-    writeModuleFile(moduleObj)
+        result = results[origin]
+        if result["status"] == "ok":
+            print(f"Fetch {origin}")
+            content = result["content"]
+            moduleObj["providers"][content["name"]] = content["base"]
+            for module in list(content["modules"].keys()):
+                moduleContent = content["modules"][module]
+                moduleObj["modules"][f'{module}@{content["name"]}'] = moduleContent
+            moduleObj["originCache"][origin] = {
+                "name": content["name"],
+                "etag": result["etag"],
+                "lastModified": result["lastModified"],
+            }
+            changed = True
+            continue
+        if result["status"] == "not-modified":
+            print(f"Unchanged {origin}")
+        else:
+            print(f"Failed {origin}: {result['error']}")
+        if origin not in originCache:
+            continue
+        providerName = originCache[origin]["name"]
+        if providerName in cachedProviders:
+            moduleObj["providers"][providerName] = cachedProviders[providerName]
+        for module, moduleContent in cachedModules.items():
+            if module.split("@")[-1] == providerName:
+                moduleObj["modules"][module] = moduleContent
+        moduleObj["originCache"][origin] = originCache[origin]
+    if changed:
+        writeModuleFile(moduleObj)
+        catalog.build(moduleObj, sourceMtime=os.stat(catalog.moduleFile).st_mtime_ns)
     print("done")
 
 
@@ -214,10 +261,95 @@ def checkModuleExist(module):
     return os.path.exists(os.path.join(sdkModulePath, module))
 
 
-def checkInstallDir(targetPath):
-    if os.path.exists(targetPath):
-        shutil.rmtree(targetPath)
-    os.mkdir(targetPath)
+def refreshPlan():
+    if plan.refresh(sdkModulePath) is None:
+        print("Load plan cache invalidated.")
+
+
+def precompileModules(modules: list[str]) -> bool:
+    failures = installer.precompile(
+        [
+            os.path.join(sdkModulePath, x)
+            for x in modules
+            if os.path.isdir(os.path.join(sdkModulePath, x))
+        ]
+    )
+    for sourceFile, error in failures.items():
+        print(
+            f"Failed to compile {os.path.relpath(sourceFile, sdkModulePath)}: {error}"
+        )
+    return not failures
+
+
+def stageModules(moduleCatalog, targets: list[str]) -> dict[str, tuple[str, str]]:
+    stagedModules = {}
+    artifactKeys = {}
+    jobs = {}
+    for target in targets:
+        moduleContent = moduleCatalog.module(target)
+        key = artifacts.artifact_key(target, moduleContent["version"])
+        artifactKeys[target] = key
+        cached = artifacts.get(key, moduleContent.get("sha256"))
+        if cached is not None:
+            print(f"Use cached {key}")
+            try:
+                stagedModules[target] = installer.stage(cached, sdkModulePath)
+            except Exception as e:
+                print(f"Failed {target}: {e}")
+            continue
+        if isOffline():
+            print(f"Failed {target}: {key} is not cached")
+            continue
+        moduleUrl = moduleCatalog.provider(target.split("@")[1]) + moduleContent["path"]
+        print(f"Fetch {moduleUrl}...")
+        jobs[target] = (
+            moduleUrl,
+            artifacts.staging_file(key),
+            moduleContent.get("sha256"),
+        )
+
+    def stageDownload(target, digest):
+        moduleZip = artifacts.put(artifactKeys[target], jobs[target][1], digest)
+        return installer.stage(moduleZip, sdkModulePath)
+
+    for target, result in net.download_many(jobs, stageDownload).items():
+        if isinstance(result, Exception):
+            print(f"Failed {target}: {result}")
+            continue
+        stagedModules[target] = result
+    if jobs:
+        artifacts.prune(artifacts.maxSize)
+    return stagedModules
+
+
+def readModuleInfo(module: str) -> dict | None:
+    if sdkModulePath not in sys.path:
+        sys.path.append(sdkModulePath)
+    try:
+        return manifest.load(os.path.join(sdkModulePath, module))
+    except errors.InvalidModuleError as e:
+        print(f"Skip {module}: {e.message}")
+        return None
+
+
+def installedModuleInfos() -> dict[str, dict]:
+    checkModuleDir()
+    moduleInfos = {}
+    for module in plan.installed_modules(sdkModulePath):
+        moduleInfo = readModuleInfo(module)
+        if moduleInfo is not None:
+            moduleInfos[module[2:]] = moduleInfo
+    return moduleInfos
+
+
+def installStaged(stagedModule: str, targetModuleName: str, confirm=True) -> bool:
+    if confirm and installer.installed(sdkModulePath, targetModuleName):
+        if input(f"\n{targetModuleName} already installed. Overwrite? (y/n) ") != "y":
+            print("Abort.")
+            installer.discard(stagedModule)
+            return False
+    installer.swap(sdkModulePath, stagedModule, targetModuleName)
+    return True
 
 
 def listModule(value):
@@ -237,23 +369,29 @@ def listModule(value):
 CmdArg.Bind("-list-module", listModule)
 
 
+def formatDependencies(dependencies: list) -> str:
+    return ", ".join(
+        f"({' | '.join(x)})" if isinstance(x, list) else x for x in dependencies
+    )
+
+
 def moduleInfo(value):
     if not checkModuleExist(value):
         print(f"Module {value} not found.")
         exit(1)
-    moduleInfo = __import__(value).moduleInfo
+    moduleInfo = manifest.read(os.path.join(sdkModulePath, value))
     print(f"NameSpace: sdk.{moduleInfo['name']}")
     print(f"Author: {moduleInfo['author']}")
     print(f"Version: {moduleInfo['version']}")
     print(f"\n  {moduleInfo['description']}\n")
     if "dependencies" in moduleInfo and len(moduleInfo["dependencies"]) > 0:
-        print(f"Dependencies: {', '.join(moduleInfo['dependencies'])}")
+        print(f"Dependencies: {formatDependencies(moduleInfo['dependencies'])}")
     if (
         "optional_dependencies" in moduleInfo
         and len(moduleInfo["optional_dependencies"]) > 0
     ):
         print(
-            f"Optional Dependencies: {', '.join(moduleInfo['optional_dependencies'])}"
+            f"Optional Dependencies: {formatDependencies(moduleInfo['optional_dependencies'])}"
         )
 
 
@@ -269,6 +407,7 @@ def enableModule(value):
         os.path.join(sdkModulePath, f"d{value}"), os.path.join(sdkModulePath, value)
     )
     print(f"Module {value} enabled.")
+    refreshPlan()
 
 
 CmdArg.Bind("-enable-module", enableModule)
@@ -283,6 +422,7 @@ def disableModule(value):
         os.path.join(sdkModulePath, value), os.path.join(sdkModulePath, f"d{value}")
     )
     print(f"Module {value} disabled.")
+    refreshPlan()
 
 
 CmdArg.Bind("-disable-module", disableModule)
@@ -294,6 +434,7 @@ def delModule(value):
         return
     shutil.rmtree(os.path.join(sdkModulePath, value))
     print(f"Module {value} deleted.")
+    refreshPlan()
 
 
 CmdArg.Bind("-del-module", delModule)
@@ -305,22 +446,20 @@ def installModule(value):
     if value == "":
         print("Please input module name.")
         exit(1)
-    moduleObj = getModuleFile()
-    moduleFind = [
-        x for x in list(moduleObj["modules"].keys()) if value.lower() in x.lower()
-    ]
+    moduleCatalog = catalog.load()
+    moduleFind = moduleCatalog.search(value)
     if len(moduleFind) == 0:
         print(f"No module match {value}.")
         exit(1)
     print(f"Found {len(moduleFind)} modules for {value}:\n")
     for item in moduleFind:
         print(f"- {item}")
-        module = moduleObj["modules"][item]
+        module = moduleCatalog.module(item)
         print(f"  Version: {module['version']}")
         print(f"  Author: {module['author']}")
         print(f"  {module['description']}")
         if "dependencies" in module and len(module["dependencies"]) > 0:
-            print(f"  Dependencies: {', '.join(module['dependencies'])}")
+            print(f"  Dependencies: {formatDependencies(module['dependencies'])}")
         if (
             "optional_dependencies" in module
             and len(module["optional_dependencies"]) > 0
@@ -337,69 +476,53 @@ def installModule(value):
     if targetModule == "" or targetModule not in moduleFind:
         print("Please input target module name.")
         exit(1)
-    print(f"\nInstalling {targetModule}...")
-    targetPath = os.path.join(sdkModulePath, "INSTALL")
-    checkInstallDir(targetPath)
-    moduleUrl = (
-        moduleObj["providers"][targetModule.split("@")[1]]
-        + moduleObj["modules"][targetModule]["path"]
-    )
-    print(f"Fetch {moduleUrl}...")
-    response = requests.get(
-        moduleUrl, headers={"User-Agent": "SDK Frame CLI"}, stream=True
-    )
-    with open(os.path.join(targetPath, "module.zip"), "wb") as f:
-        for chunk in response.iter_content(chunk_size=1024):
-            if chunk:
-                f.write(chunk)
-    print("Extracting...")
-    shutil.unpack_archive(os.path.join(targetPath, "module.zip"), targetPath)
-    os.remove(os.path.join(targetPath, "module.zip"))
-    targetModuleName = [
-        x for x in os.listdir(targetPath) if os.path.isdir(os.path.join(targetPath, x))
-    ][0]
-    if not targetModuleName.startswith("m_"):
-        os.rename(
-            os.path.join(targetPath, targetModuleName),
-            os.path.join(targetPath, "m_" + targetModuleName),
-        )
-        targetModuleName = "m_" + targetModuleName
-    if os.path.exists(os.path.join(sdkModulePath, targetModuleName)) or os.path.exists(
-        os.path.join(sdkModulePath, "d" + targetModuleName)
-    ):
-        if input(f"\n{targetModuleName} already installed. Overwrite? (y/n) ") == "y":
-            if os.path.exists(os.path.join(sdkModulePath, "d" + targetModuleName)):
-                os.rename(
-                    os.path.join(sdkModulePath, "d" + targetModuleName),
-                    os.path.join(sdkModulePath, targetModuleName),
+    print("\nResolve Dependencies...")
+    try:
+        installPlan = resolver.Resolver(
+            moduleCatalog, installedModuleInfos(), optional=withOptional()
+        ).resolve([targetModule])
+    except (
+        errors.ResolutionError,
+        errors.InvalidDependencyError,
+        errors.CycleDependencyError,
+    ) as e:
+        print(f"Cannot install {targetModule}: {e}")
+        exit(1)
+    installed = installedModuleInfos()
+    print("\nInstall plan:")
+    for step in installPlan:
+        if step["action"] == "keep":
+            print(f"  keep     {step['name']} {step['version']}")
+        elif step["action"] == "upgrade":
+            installedVersion = installed[step["name"]].get("version", "0")
+            if installedVersion == step["version"]:
+                print(f"  reinstall {step['key']} {step['version']}")
+            else:
+                print(
+                    f"  upgrade  {step['key']} {installedVersion} -> {step['version']}"
                 )
-            shutil.rmtree(os.path.join(sdkModulePath, targetModuleName))
         else:
-            print("Abort.")
-            shutil.rmtree(targetPath)
-            return
-    shutil.move(
-        os.path.join(targetPath, targetModuleName),
-        os.path.join(sdkModulePath, targetModuleName),
-    )
-    print(f"Module {targetModuleName} installed.")
-    shutil.rmtree(targetPath)
-    print("\nScan Dependencies...")
-    targetModuleObj = moduleObj["modules"][targetModule]
-    if "dependencies" in targetModuleObj and len(targetModuleObj["dependencies"]) > 0:
-        print(
-            "  Need {} dependencies: {}".format(
-                len(targetModuleObj["dependencies"]),
-                " ".join(targetModuleObj["dependencies"]),
-            )
-        )
-        if input("Install? (y/n) ") == "y":
-            for dep in targetModuleObj["dependencies"]:
-                if dep.startswith("m_"):
-                    dep = dep[2:]
-                installModule(dep)
+            print(f"  install  {step['key']} {step['version']}")
+    installSteps = [x for x in installPlan if x["action"] != "keep"]
+    if input("\nProceed? (y/n) ") != "y":
+        print("Abort.")
+        return
+    stagedModules = stageModules(moduleCatalog, [x["key"] for x in installSteps])
+    if len(stagedModules) != len(installSteps):
+        for stagedModule, _ in stagedModules.values():
+            installer.discard(stagedModule)
+        print("Abort, nothing installed.")
+        exit(1)
+    for step in installSteps:
+        stagedModule, targetModuleName = stagedModules[step["key"]]
+        installStaged(stagedModule, targetModuleName, confirm=False)
+        print(f"Module {targetModuleName} installed.")
+    precompileModules([stagedModules[x["key"]][1] for x in installSteps])
+    refreshPlan()
+    targetModuleObj = moduleCatalog.module(targetModule)
     if (
-        "optional_dependencies" in targetModuleObj
+        not withOptional()
+        and "optional_dependencies" in targetModuleObj
         and len(targetModuleObj["optional_dependencies"]) > 0
     ):
         print("  Module has optional dependencies: ", end="")
@@ -408,11 +531,12 @@ def installModule(value):
                 print(f"{opt_dep} ", end="")
             if type(opt_dep) == list:
                 print(f"({' | '.join(opt_dep)}) ", end="")
-        print("\n  You can install them anytime.")
+        print("\n  You can install them with -with-optional.")
     print("Done.")
 
 
 CmdArg.Bind("-install-module", installModule)
+CmdArg.Bind("-with-optional", lambda value: None)
 
 
 def loadModuleZip(value):
@@ -420,39 +544,13 @@ def loadModuleZip(value):
     if not os.path.exists(value):
         print(f"File {value} not found.")
         exit(1)
-    targetPath = os.path.join(sdkModulePath, "INSTALL")
-    checkInstallDir(targetPath)
     print(f"Extracting {value}...")
-    shutil.unpack_archive(value, targetPath)
-    targetModuleName = [
-        x for x in os.listdir(targetPath) if os.path.isdir(os.path.join(targetPath, x))
-    ][0]
-    if not targetModuleName.startswith("m_"):
-        os.rename(
-            os.path.join(targetPath, targetModuleName),
-            os.path.join(targetPath, "m_" + targetModuleName),
-        )
-        targetModuleName = "m_" + targetModuleName
-    if os.path.exists(os.path.join(sdkModulePath, targetModuleName)) or os.path.exists(
-        os.path.join(sdkModulePath, "d" + targetModuleName)
-    ):
-        if input(f"\n{targetModuleName} already installed. Overwrite? (y/n) ") == "y":
-            if os.path.exists(os.path.join(sdkModulePath, "d" + targetModuleName)):
-                os.rename(
-                    os.path.join(sdkModulePath, "d" + targetModuleName),
-                    os.path.join(sdkModulePath, targetModuleName),
-                )
-            shutil.rmtree(os.path.join(sdkModulePath, targetModuleName))
-        else:
-            print("Abort.")
-            shutil.rmtree(targetPath)
-            return
-    shutil.move(
-        os.path.join(targetPath, targetModuleName),
-        os.path.join(sdkModulePath, targetModuleName),
-    )
+    stagedModule, targetModuleName = installer.stage(value, sdkModulePath)
+    if not installStaged(stagedModule, targetModuleName):
+        return
     print(f"Module {targetModuleName} installed.")
-    shutil.rmtree(targetPath)
+    precompileModules([targetModuleName])
+    refreshPlan()
 
 
 CmdArg.Bind("-load-zip", loadModuleZip)
@@ -461,23 +559,22 @@ CmdArg.Bind("-load-zip", loadModuleZip)
 def checkUpgrade(value):
     checkModuleDir()
     checkModuleFile()
-    updateOrigin("")
-    sdkInstalledModules: list[object] = [
-        __import__(x)
-        for x in os.listdir(sdkModulePath)
-        if os.path.isdir(os.path.join(sdkModulePath, x)) and x.startswith("m_")
-    ]
-    moduleObj = getModuleFile()
-    moduleDict: dict = moduleObj["modules"]
-    moduleList: list = list(moduleDict.keys())
+    if not isOffline():
+        updateOrigin("")
+    sdkInstalledModules: list[str] = plan.installed_modules(sdkModulePath)
+    moduleCatalog = catalog.load()
     upgradeList: dict = {}
+    installedVersions: dict = {}
     for module in sdkInstalledModules:
-        modulePackage: str = module.__package__[2:]
-        moduleVersion: str = module.moduleInfo["version"]
-        upgradeCandidates: list = [
-            x for x in moduleList if x.split("@")[0] == modulePackage
-        ]
-        targetCandidate: str = upgradeCandidates[0]
+        modulePackage: str = module[2:]
+        moduleInfo = readModuleInfo(module)
+        if moduleInfo is None:
+            continue
+        moduleVersion: str = moduleInfo["version"]
+        upgradeCandidates: dict = moduleCatalog.candidates(modulePackage)
+        if len(upgradeCandidates) == 0:
+            continue
+        targetCandidate: str = list(upgradeCandidates.keys())[0]
         if len(upgradeCandidates) > 1:
             print(f"Module {modulePackage} has more than one provider.\n")
             for candidate in upgradeCandidates:
@@ -486,88 +583,76 @@ def checkUpgrade(value):
             if targetCandidate not in upgradeCandidates:
                 print("Invalid input.")
                 exit(1)
-        if moduleDict[targetCandidate]["version"] != moduleVersion:
-            if (
-                compare_versions(moduleVersion, moduleDict[targetCandidate]["version"])
-                == -1
-            ):
-                upgradeList[modulePackage] = targetCandidate
+        candidateKey = upgradeCandidates[targetCandidate]
+        installedKey = catalog.version_key(moduleVersion)
+        if None not in (candidateKey, installedKey) and installedKey < candidateKey:
+            upgradeList[modulePackage] = targetCandidate
+            installedVersions[modulePackage] = moduleVersion
     if len(upgradeList) == 0:
         print("All modules are up to date.")
         return
     print(f"Found {len(upgradeList)} modules need upgrade:\n")
     for module, target in upgradeList.items():
-        print(f"  {target}: {moduleVersion} -> {moduleDict[target]["version"]}")
+        targetVersion = moduleCatalog.module(target)["version"]
+        print(f"  {target}: {installedVersions[module]} -> {targetVersion}")
     if input("\nUpgrade? (y/n) ") == "y":
-        targetPath = os.path.join(sdkModulePath, "INSTALL")
+        stagedModules = stageModules(moduleCatalog, list(upgradeList.values()))
         for module, target in upgradeList.items():
+            if target not in stagedModules:
+                continue
             print(f"\nUpgrading {module}...")
-            checkInstallDir(targetPath)
-            moduleUrl = (
-                moduleObj["providers"][target.split("@")[1]]
-                + moduleDict[target]["path"]
-            )
-            print(f"Fetch {moduleUrl}...")
-            response = requests.get(
-                moduleUrl, headers={"User-Agent": "SDK Frame CLI"}, stream=True
-            )
-            with open(os.path.join(targetPath, "module.zip"), "wb") as f:
-                for chunk in response.iter_content(chunk_size=1024):
-                    if chunk:
-                        f.write(chunk)
-            print("Extracting...")
-            shutil.unpack_archive(os.path.join(targetPath, "module.zip"), targetPath)
-            os.remove(os.path.join(targetPath, "module.zip"))
-            targetModuleName = [
-                x
-                for x in os.listdir(targetPath)
-                if os.path.isdir(os.path.join(targetPath, x))
-            ][0]
-            if not targetModuleName.startswith("m_"):
-                os.rename(
-                    os.path.join(targetPath, targetModuleName),
-                    os.path.join(targetPath, "m_" + targetModuleName),
-                )
-                targetModuleName = "m_" + targetModuleName
-            shutil.rmtree(os.path.join(sdkModulePath, targetModuleName))
-            shutil.move(
-                os.path.join(targetPath, targetModuleName),
-                os.path.join(sdkModulePath, targetModuleName),
-            )
+            installStaged(*stagedModules[target], confirm=False)
             print(f"Module {module} upgraded.")
-        shutil.rmtree(targetPath)
+        precompileModules(
+            [stagedModules[x][1] for x in upgradeList.values() if x in stagedModules]
+        )
+        refreshPlan()
         print("Done.")
 
 
 CmdArg.Bind("-check-upgrade", checkUpgrade)
 
 
-# For Persional Origin
-checkOriginDir = checkInstallDir
-
-
-def zip_dir(src_dir, dst_zip):
-    base_dir = os.path.normpath(src_dir)
-    main_folder = os.path.basename(base_dir)
-    with zipfile.ZipFile(dst_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(base_dir):
-            dirs[:] = [d for d in dirs if d != "__pycache__"]
-            files = [f for f in files if not f.startswith(".")]
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
-            for file in files:
-                file_path = os.path.join(root, file)
-                parent_dir = os.path.dirname(base_dir)
-                arcname_rel = os.path.relpath(file_path, parent_dir)
-                arcname = os.path.join(
-                    main_folder, os.path.relpath(file_path, base_dir)
-                )
-                zipf.write(file_path, arcname)
+def rollbackModule(value):
+    checkModuleDir()
+    if not installer.rollback(sdkModulePath, value):
+        print(f"Module {value} has no previous version.")
+        exit(1)
+    print(f"Module {value} rolled back.")
+    refreshPlan()
+
+
+CmdArg.Bind("-rollback-module", rollbackModule)
+
+
+def precompile(value):
+    checkModuleDir()
+    if value:
+        if not checkModuleExist(value):
+            print(f"Module {value} not found.")
+            exit(1)
+        modules = [value]
+    else:
+        modules = sorted(
+            x
+            for x in os.listdir(sdkModulePath)
+            if x.startswith(("m_", "dm_"))
+            and os.path.isdir(os.path.join(sdkModulePath, x))
+        )
+    print(f"Compiling {len(modules)} modules...")
+    if not precompileModules(modules):
+        exit(1)
+    print("Done.")
+
+
+CmdArg.Bind("-precompile", precompile)
 
 
+# For Persional Origin
 def makeOrigin(value):
     checkModuleFile()
     targetPath = os.path.join(".", "origin-release")
-    checkOriginDir(targetPath)
+    os.makedirs(targetPath, exist_ok=True)
     if not os.path.exists(os.path.join(".", "origin-maker-config.json")):
         with open(os.path.join(".", "origin-maker-config.json"), "w") as f:
             f.write(
@@ -581,40 +666,166 @@ def makeOrigin(value):
             )
     with open(os.path.join(".", "origin-maker-config.json"), "r") as f:
         origin_config = json.loads(f.read())
+    stateFile = os.path.join(".", "origin-maker-state.json")
+    origin_state = release.read_state(stateFile)
     origin_modules = {}
-    sdkInstalledModules: list[str] = [
-        os.path.basename(x)
-        for x in os.listdir(sdkModulePath)
-        if os.path.isdir(os.path.join(sdkModulePath, x)) and x.startswith("m_")
-    ]
+    origin_bodies = {}
+    origin_builds = {}
+    sdkInstalledModules: list[str] = sorted(plan.installed_modules(sdkModulePath))
     for module in sdkInstalledModules:
-        print(f"Add {module} to origin...")
-        moduleInfo: dict = __import__(module).moduleInfo
+        moduleInfo = readModuleInfo(module)
+        if moduleInfo is None:
+            continue
         origin_module_body = moduleInfo.copy()
         del origin_module_body["name"]
         origin_module_body["path"] = f"/{module}.zip"
         origin_modules[moduleInfo["name"]] = origin_module_body
-        zip_dir(
+        origin_bodies[module] = origin_module_body
+        treeHash = release.tree_hash(os.path.join(sdkModulePath, module))
+        moduleState = origin_state.get(module, {})
+        if moduleState.get("treeHash") == treeHash and os.path.exists(
+            os.path.join(targetPath, f"{module}.zip")
+        ):
+            print(f"Keep {module} in origin...")
+            origin_module_body["sha256"] = moduleState["sha256"]
+            continue
+        print(f"Add {module} to origin...")
+        origin_state[module] = {"treeHash": treeHash}
+        origin_builds[module] = (
             os.path.join(sdkModulePath, module),
             os.path.join(targetPath, f"{module}.zip"),
         )
+    for module, sha256 in release.build_zips(origin_builds).items():
+        origin_bodies[module]["sha256"] = sha256
+        origin_state[module]["sha256"] = sha256
+    for module in list(origin_state.keys()):
+        if module not in sdkInstalledModules:
+            print(f"Remove {module} from origin...")
+            del origin_state[module]
+            if os.path.exists(os.path.join(targetPath, f"{module}.zip")):
+                os.remove(os.path.join(targetPath, f"{module}.zip"))
     print(f"Make map.json...")
     origin_map = {**origin_config, **{"modules": origin_modules}}
     with open(os.path.join(targetPath, "map.json"), "w") as f:
         json.dump(origin_map, f, indent=2, ensure_ascii=False)
+    release.write_state(stateFile, origin_state)
     print(f"Make origin release at {targetPath}.")
 
 
 CmdArg.Bind("-make-origin", makeOrigin)
 
 
+# For Cache
+def cacheStats(value):
+    cacheInfo = artifacts.stats()
+    print(f"Path: {cacheInfo['path']}")
+    print(f"Entries: {cacheInfo['entries']}")
+    print(f"Objects: {cacheInfo['objects']}")
+    print(f"Size: {cacheInfo['size']} / {cacheInfo['maxSize']} bytes")
+
+
+CmdArg.Bind("-cache-stats", cacheStats)
+
+
+def cachePrune(value):
+    removed = artifacts.prune(int(value) if value else artifacts.maxSize)
+    print(f"Removed {removed} cached artifacts.")
+
+
+CmdArg.Bind("-cache-prune", cachePrune)
+CmdArg.Bind("-offline", lambda value: None)
+
+
+# For Profile
+def profileInit(value):
+    from . import init
+
+    sdk = init()
+    print("")
+    print(sdk.load_report.table())
+    if value:
+        sdk.load_report.write_trace(value)
+        print(f"Trace written to {value}.")
+
+
+CmdArg.Bind("-profile-init", profileInit)
+
+
+# For Freeze
+def freezeModules(value):
+    checkModuleDir()
+    targetFile = value or "sdk-frame.zip"
+    frozen = freeze.freeze(os.path.dirname(__file__), sdkModulePath, targetFile)
+    print(
+        f"Froze {frozen['modules']} modules ({frozen['files']} files, "
+        f"{frozen['compiled']} compiled) into {targetFile}, {frozen['size']} bytes."
+    )
+    print(f"Add {os.path.abspath(targetFile)} to sys.path to boot from it.")
+
+
+CmdArg.Bind("-freeze", freezeModules)
+
+
+# For Batch
+def runCommand(cmdArgs: list[str]) -> int:
+    try:
+        CmdArg.Execute(cmdArgs)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    return 0
+
+
+def runBatch(value):
+    batchFile = sys.stdin if value in ("", "-") else open(value, "r")
+    try:
+        for lineNo, line in enumerate(batchFile, 1):
+            cmdArgs = shlex.split(line, comments=True)
+            if not cmdArgs:
+                continue
+            code = runCommand(cmdArgs)
+            if code:
+                print(f"Batch stopped at line {lineNo}: {line.strip()}")
+                exit(code)
+    finally:
+        if batchFile is not sys.stdin:
+            batchFile.close()
+
+
+CmdArg.Bind("-batch", runBatch)
+
+
+def serveRequest(cmdArgs: list[str]) -> int:
+    try:
+        return runCommand(cmdArgs)
+    finally:
+        flushEnv()
+
+
+def runDaemon(value):
+    print(f"Daemon listening on {value or daemon.socketPath}")
+    daemon.serve(value or daemon.socketPath, sdkModulePath, serveRequest)
+
+
+CmdArg.Bind("-daemon", runDaemon)
+
+
+def stopDaemon(value):
+    if not daemon.stop(value or daemon.socketPath):
+        print("Daemon is not running.")
+        exit(1)
+
+
+CmdArg.Bind("-daemon-stop", stopDaemon)
+
+
 def showHelp(value):
     print(
         """
 SDK Frame CLI Usage:
 
   For Env:
-    -set-env <key> [<type>:]<value>  Set environment variable. <type> can be "str", "int", "float", "bool", "json".
+    -set-env <key>=[<type>:]<value>  Set environment variable. <type> can be "str", "int", "float", "bool", "json".
+                                     Repeat to set several keys in one write.
     -del-env <key>                   Delete environment variable.
     -list-env                        List all environment variables.
 
@@ -631,9 +842,30 @@ SDK Frame CLI Usage:
     -enable-module <module>          Enable module.
     -disable-module <module>         Disable module.
     -del-module <module>             Delete module.
-    -install-module <module>         Install module.
+    -install-module <module>         Install module with all its dependencies in one batch.
+    -with-optional                   Also resolve optional dependencies when installing.
     -load-zip <zipfile>              Install module from zip file.
     -check-upgrade                   Check and upgrade all modules.
+    -rollback-module <module>        Restore the version replaced by the last install.
+    -precompile [<module>]           Compile installed modules to hash-checked bytecode.
+
+  For Cache:
+    -cache-stats                     Show module artifact cache usage.
+    -cache-prune [<bytes>]           Evict least recently used artifacts above <bytes>.
+    -offline                         Install and upgrade from the artifact cache only.
+
+  For Profile:
+    -profile-init [<trace>]          Time init() per module and optionally write a Chrome trace file.
+
+  For Freeze:
+    -freeze [<archive>]              Bundle the framework, enabled modules, bytecode and load plan
+                                     into one zipimport archive (default sdk-frame.zip).
+
+  For Batch:
+    -batch [<file>]                  Run one command per line from <file> or stdin.
+    -daemon [<socket>]               Serve commands on a Unix socket, keeping state warm.
+    -daemon-stop [<socket>]          Stop the daemon.
+                                     Set SDK_FRAME_DAEMON=<socket> to route commands to it.
 """
     )
 
@@ -641,4 +873,12 @@ SDK Frame CLI Usage:
 CmdArg.Bind("-help", showHelp)
 
 CmdArg.OnError("Invalid command.")
-CmdArg.Execute()
+if __name__ == "__main__":
+    if "SDK_FRAME_DAEMON" in os.environ and not {"-daemon", "-daemon-stop"} & set(
+        CmdArg.cmdArgs
+    ):
+        code = daemon.forward(daemon.socketPath, sdkModulePath, CmdArg.cmdArgs)
+        if code is not None:
+            exit(code)
+    CmdArg.Execute()
+    flushEnv()
@@ -0,0 +1,106 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+cachePath = os.environ.get(
+    "SDK_FRAME_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "sdk-frame", "artifacts"),
+)
+maxSize = int(os.environ.get("SDK_FRAME_CACHE_SIZE", 1024 * 1024 * 1024))
+
+_lock = threading.Lock()
+
+
+def artifact_key(target: str, version: str) -> str:
+    return f"{target}+{version}"
+
+
+def _index_file() -> str:
+    return os.path.join(cachePath, "index.json")
+
+
+def _object_file(digest: str) -> str:
+    return os.path.join(cachePath, "objects", digest[:2], f"{digest}.zip")
+
+
+def read_index() -> dict:
+    try:
+        with open(_index_file(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_index(index: dict):
+    os.makedirs(cachePath, exist_ok=True)
+    with open(_index_file() + ".tmp", "w") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(_index_file() + ".tmp", _index_file())
+
+
+def staging_file(key: str) -> str:
+    stagingPath = os.path.join(cachePath, "tmp")
+    os.makedirs(stagingPath, exist_ok=True)
+    return os.path.join(stagingPath, hashlib.sha1(key.encode()).hexdigest() + ".zip")
+
+
+def get(key: str, sha256: str | None = None) -> str | None:
+    digest = sha256.lower() if sha256 else read_index().get(key)
+    if not digest:
+        return None
+    objectFile = _object_file(digest)
+    if not os.path.exists(objectFile):
+        return None
+    os.utime(objectFile)
+    return objectFile
+
+
+def put(key: str, sourceFile: str, digest: str) -> str:
+    objectFile = _object_file(digest)
+    os.makedirs(os.path.dirname(objectFile), exist_ok=True)
+    shutil.move(sourceFile, objectFile)
+    with _lock:
+        index = read_index()
+        index[key] = digest
+        write_index(index)
+    return objectFile
+
+
+def _objects() -> list[tuple]:
+    objects = []
+    for root, dirs, files in os.walk(os.path.join(cachePath, "objects")):
+        for file in files:
+            stat = os.stat(os.path.join(root, file))
+            objects.append((stat.st_mtime, stat.st_size, os.path.join(root, file)))
+    return objects
+
+
+def stats() -> dict:
+    objects = _objects()
+    return {
+        "path": cachePath,
+        "entries": len(read_index()),
+        "objects": len(objects),
+        "size": sum(size for _, size, _ in objects),
+        "maxSize": maxSize,
+    }
+
+
+def prune(limit: int = maxSize) -> int:
+    with _lock:
+        objects = sorted(_objects())
+        total = sum(size for _, size, _ in objects)
+        removed = 0
+        for _, size, objectFile in objects:
+            if total <= limit:
+                break
+            os.remove(objectFile)
+            total -= size
+            removed += 1
+        index = read_index()
+        alive = {k: v for k, v in index.items() if os.path.exists(_object_file(v))}
+        if alive != index:
+            write_index(alive)
+        return removed
@@ -0,0 +1,382 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import functools
+import subprocess
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+repoRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+shapes = ("flat", "chain", "tree", "layered", "random")
+frameworkIgnore = shutil.ignore_patterns(
+    ".git",
+    "modules",
+    "benchmarks",
+    "__pycache__",
+    "*.db",
+    "module.json",
+    "env.json",
+    "origin-*",
+    "requests.jsonl",
+)
+
+probeSource = """
+import os
+import sys
+import json
+import time
+
+started = time.perf_counter()
+import sdk
+from sdk import plan, logger
+
+imported = time.perf_counter()
+mode = sys.argv[1]
+if mode == "phases":
+    logger.configure({"level": "WARNING"})
+    modulePath = os.path.join(os.path.dirname(sdk.__file__), "modules")
+    timings = {"import": imported - started}
+    t0 = time.perf_counter()
+    loadPlan = plan.build(modulePath, importFallback=True)
+    timings["plan"] = time.perf_counter() - t0
+    plan.write(modulePath, loadPlan)
+    sdkObj = sdk.init(cache=True)
+    modules = sdkObj.load_report.modules.values()
+    for phase in ("import", "construct", "install"):
+        timings["module_" + phase] = sum(x[phase] for x in modules)
+else:
+    options = json.loads(sys.argv[2])
+    a = time.perf_counter()
+    sdk.init(**options)
+    timings = {"import": imported - started, "init": time.perf_counter() - a}
+print(json.dumps(timings))
+"""
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def dependencies_for(index: int, count: int, shape: str, rng: random.Random):
+    if index == 0 or shape == "flat":
+        return []
+    if shape == "chain":
+        return [index - 1]
+    if shape == "tree":
+        return [(index - 1) // 2]
+    if shape == "layered":
+        width = max(1, int(count**0.5))
+        layer = index // width
+        if layer == 0:
+            return []
+        previous = range((layer - 1) * width, layer * width)
+        return sorted({previous[index % width], previous[(index + 1) % width]})
+    return sorted(rng.sample(range(index), min(index, rng.randint(0, 3))))
+
+
+def write_module(
+    modulePath: str,
+    index: int,
+    dependencies: list[int],
+    weight: int,
+    install: bool,
+    inline: bool,
+    version: str = "1.0",
+):
+    package = f"m_bench{index:05d}"
+    moduleDir = os.path.join(modulePath, package)
+    os.makedirs(moduleDir, exist_ok=True)
+    moduleInfo = {
+        "name": f"bench{index:05d}",
+        "author": "bench",
+        "version": version,
+        "description": f"Synthetic module {index}",
+        "dependencies": [f"m_bench{dep:05d}" for dep in dependencies],
+    }
+    lines = []
+    if inline:
+        lines.append(f"moduleInfo = {moduleInfo!r}")
+    else:
+        with open(os.path.join(moduleDir, "module.json"), "w") as f:
+            json.dump(moduleInfo, f)
+    for i in range(weight):
+        lines.append(f"def _work{i}(value):\n    return value * {i} + {i}")
+    depNames = [f"bench{dep:05d}" for dep in dependencies]
+    lines.append("class Main:")
+    lines.append("    def __init__(self, sdk, logger):")
+    lines.append("        self.sdk = sdk")
+    lines.append(f"        self.deps = [getattr(sdk, name) for name in {depNames!r}]")
+    if install:
+        lines.append("    def install(self, sdk):")
+        lines.append("        return sdk")
+    with open(os.path.join(moduleDir, "__init__.py"), "w") as f:
+        f.write("\n\n".join(lines) + "\n")
+    return package
+
+
+def make_tree(
+    workspace: str,
+    count: int,
+    shape: str,
+    weight: int,
+    installEvery: int,
+    inline: bool,
+    seed: int,
+    version: str = "1.0",
+) -> str:
+    frameworkPath = os.path.join(workspace, "sdk")
+    shutil.copytree(repoRoot, frameworkPath, ignore=frameworkIgnore)
+    modulePath = os.path.join(frameworkPath, "modules")
+    os.makedirs(modulePath)
+    rng = random.Random(seed)
+    for index in range(count):
+        write_module(
+            modulePath,
+            index,
+            dependencies_for(index, count, shape, rng),
+            weight,
+            bool(installEvery) and index % installEvery == 0,
+            inline,
+            version,
+        )
+    with open(os.path.join(workspace, "env.json"), "w") as f:
+        json.dump({"logging": {"level": "WARNING"}}, f)
+    return modulePath
+
+
+def child_env(workspace: str, **extra) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = workspace
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    env.pop("SDK_FRAME_DAEMON", None)
+    env.update(extra)
+    return env
+
+
+def run_probe(workspace: str, *probeArgs: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", probeSource, *probeArgs],
+        cwd=workspace,
+        env=child_env(workspace),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_cli(workspace: str, cmdArgs: list[str], answers: str = "", **env) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "sdk", *cmdArgs],
+        cwd=workspace,
+        env=child_env(workspace, **env),
+        input=answers,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started
+
+
+def bench_init(args, count: int, shape: str) -> dict:
+    with tempfile.TemporaryDirectory() as workspace:
+        make_tree(
+            workspace,
+            count,
+            shape,
+            args.weight,
+            args.install_every,
+            args.inline,
+            args.seed,
+        )
+        phases: dict[str, list[float]] = {}
+        for _ in range(args.repeat):
+            for phase, elapsed in run_probe(workspace, "phases").items():
+                phases.setdefault(phase, []).append(elapsed)
+        runs: dict[str, list[float]] = {}
+        modes = {
+            "init": {"cache": False},
+            "initCached": {"cache": True},
+            "initLazy": {"lazy": True},
+            "initParallel": {"cache": True, "workers": args.workers},
+        }
+        for mode, options in modes.items():
+            if options.get("cache"):
+                run_probe(workspace, "init", json.dumps(options))
+            for _ in range(args.repeat):
+                timings = run_probe(workspace, "init", json.dumps(options))
+                runs.setdefault(mode, []).append(timings["init"])
+    return {
+        "modules": count,
+        "shape": shape,
+        "weight": args.weight,
+        "phases": {phase: summarize(x) for phase, x in phases.items()},
+        "endToEnd": {mode: summarize(x) for mode, x in runs.items()},
+    }
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset_installed(modulePath: str, count: int, upgrades: int):
+    for entry in os.listdir(modulePath):
+        if entry.startswith(("m_", "dm_", ".rollback")):
+            shutil.rmtree(os.path.join(modulePath, entry))
+    for index in range(min(count, upgrades)):
+        write_module(modulePath, index, [], 1, False, False, "0.1")
+
+
+def bench_cli(args, count: int) -> dict:
+    samples: dict[str, list[float]] = {}
+    with tempfile.TemporaryDirectory() as root:
+        publisher = os.path.join(root, "publisher")
+        consumer = os.path.join(root, "consumer")
+        os.makedirs(publisher)
+        os.makedirs(consumer)
+        make_tree(publisher, count, "flat", 1, 0, False, args.seed)
+        releasePath = os.path.join(publisher, "origin-release")
+        server = serve(releasePath)
+        baseUrl = f"http://127.0.0.1:{server.server_address[1]}"
+        with open(os.path.join(publisher, "origin-maker-config.json"), "w") as f:
+            json.dump({"name": "bench", "base": baseUrl}, f)
+        try:
+            for _ in range(args.repeat):
+                shutil.rmtree(releasePath, ignore_errors=True)
+                stateFile = os.path.join(publisher, "origin-maker-state.json")
+                if os.path.exists(stateFile):
+                    os.remove(stateFile)
+                samples.setdefault("-make-origin", []).append(
+                    run_cli(publisher, ["-make-origin"])
+                )
+                samples.setdefault("-make-origin (unchanged)", []).append(
+                    run_cli(publisher, ["-make-origin"])
+                )
+            modulePath = make_tree(consumer, 0, "flat", 1, 0, False, args.seed)
+            with open(os.path.join(consumer, "module.json"), "w") as f:
+                json.dump({"origins": [f"{baseUrl}/map.json"]}, f)
+            run_cli(consumer, ["-update-origin"])
+            target = f"bench{count - 1:05d}@bench"
+            upgrades = min(count - 1, args.upgrades)
+            for run in range(args.repeat):
+                cachePath = os.path.join(root, f"cache{run}")
+                reset_installed(modulePath, count, upgrades)
+                samples.setdefault("-list-module", []).append(
+                    run_cli(consumer, ["-list-module"])
+                )
+                samples.setdefault("-install-module", []).append(
+                    run_cli(
+                        consumer,
+                        ["-install-module", f"bench{count - 1:05d}"],
+                        f"{target}\ny\n",
+                        SDK_FRAME_CACHE=cachePath,
+                    )
+                )
+                samples.setdefault("-check-upgrade", []).append(
+                    run_cli(
+                        consumer, ["-check-upgrade"], "y\n", SDK_FRAME_CACHE=cachePath
+                    )
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+    return {
+        "catalog": count,
+        "upgrades": upgrades,
+        "commands": {command: summarize(x) for command, x in samples.items()},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=repoRoot,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def int_list(value: str) -> list[int]:
+    return [int(x) for x in value.split(",") if x]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark SDK Frame startup and CLI operations."
+    )
+    parser.add_argument("--modules", type=int_list, default=[10, 100, 500])
+    parser.add_argument(
+        "--shapes", type=lambda x: x.split(","), default=["flat", "tree", "layered"]
+    )
+    parser.add_argument("--weight", type=int, default=20)
+    parser.add_argument("--install-every", type=int, default=3)
+    parser.add_argument("--inline", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--catalogs", type=int_list, default=[10, 100, 1000])
+    parser.add_argument("--upgrades", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-init", action="store_true")
+    parser.add_argument("--skip-cli", action="store_true")
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args()
+    for shape in args.shapes:
+        if shape not in shapes:
+            parser.error(f"Unknown shape {shape}, expected one of {shapes}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "config": vars(args),
+        "init": [],
+        "cli": [],
+    }
+    if not args.skip_init:
+        for count in args.modules:
+            for shape in args.shapes:
+                print(f"init: {count} modules, {shape}", file=sys.stderr)
+                report["init"].append(bench_init(args, count, shape))
+    if not args.skip_cli:
+        for count in args.catalogs:
+            print(f"cli: catalog of {count}", file=sys.stderr)
+            report["cli"].append(bench_cli(args, count))
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
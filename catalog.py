@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import sqlite3
+from functools import lru_cache
+
+catalogVersion = 1
+moduleFile = "./module.json"
+catalogFile = "./module.db"
+
+
+@lru_cache(maxsize=None)
+def parse_version(version: str) -> tuple[int, ...]:
+    return tuple(map(int, version.split(".")))
+
+
+def version_key(version: str) -> str | None:
+    try:
+        parsed = list(parse_version(version))
+    except ValueError:
+        return None
+    while parsed and parsed[-1] == 0:
+        parsed.pop()
+    return ".".join(f"{x:08d}" for x in parsed)
+
+
+def tokens(key: str) -> set[str]:
+    name = key.split("@")[0].lower()
+    return {x for x in re.split(r"[^0-9a-z]+", key.lower()) if x} | {name}
+
+
+def build(moduleObj: dict, dbFile: str = catalogFile, sourceMtime: int = 0):
+    if os.path.exists(dbFile + ".tmp"):
+        os.remove(dbFile + ".tmp")
+    db = sqlite3.connect(dbFile + ".tmp")
+    db.executescript("""
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE providers (name TEXT PRIMARY KEY, base TEXT);
+        CREATE TABLE modules (
+            key TEXT PRIMARY KEY, name TEXT, provider TEXT,
+            version TEXT, versionKey TEXT, body TEXT
+        );
+        CREATE TABLE tokens (token TEXT, key TEXT);
+        CREATE INDEX modules_name ON modules (name);
+        CREATE INDEX tokens_token ON tokens (token);
+        """)
+    db.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        [("version", str(catalogVersion)), ("sourceMtime", str(sourceMtime))],
+    )
+    db.executemany(
+        "INSERT INTO providers VALUES (?, ?)",
+        list(moduleObj.get("providers", {}).items()),
+    )
+    for key, body in moduleObj.get("modules", {}).items():
+        name, _, provider = key.partition("@")
+        db.execute(
+            "INSERT INTO modules VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                name,
+                provider,
+                body.get("version"),
+                version_key(str(body.get("version", ""))),
+                json.dumps(body, ensure_ascii=False),
+            ),
+        )
+        db.executemany(
+            "INSERT INTO tokens VALUES (?, ?)", [(x, key) for x in tokens(key)]
+        )
+    db.commit()
+    db.close()
+    os.replace(dbFile + ".tmp", dbFile)
+
+
+_loaded: dict[str, "Catalog"] = {}
+
+
+def load(jsonFile: str = moduleFile, dbFile: str = catalogFile):
+    sourceMtime = os.stat(jsonFile).st_mtime_ns
+    cacheKey = os.path.abspath(dbFile)
+    moduleCatalog = _loaded.pop(cacheKey, None)
+    if moduleCatalog is None and os.path.exists(dbFile):
+        moduleCatalog = Catalog(dbFile)
+    if moduleCatalog is not None:
+        if moduleCatalog.meta("version") == str(catalogVersion) and moduleCatalog.meta(
+            "sourceMtime"
+        ) == str(sourceMtime):
+            _loaded[cacheKey] = moduleCatalog
+            return moduleCatalog
+        moduleCatalog.close()
+    with open(jsonFile, "r") as f:
+        build(json.load(f), dbFile, sourceMtime)
+    _loaded[cacheKey] = Catalog(dbFile)
+    return _loaded[cacheKey]
+
+
+class Catalog:
+    def __init__(self, dbFile: str = catalogFile):
+        self.db = sqlite3.connect(dbFile)
+
+    def close(self):
+        self.db.close()
+
+    def meta(self, key: str) -> str | None:
+        try:
+            row = self.db.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row else None
+
+    def provider(self, name: str) -> str:
+        row = self.db.execute(
+            "SELECT base FROM providers WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row[0]
+
+    def module(self, key: str) -> dict:
+        row = self.db.execute(
+            "SELECT body FROM modules WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def search(self, query: str) -> list[str]:
+        query = query.lower()
+        rows = self.db.execute(
+            "SELECT key FROM tokens WHERE token >= ? AND token < ? "
+            "UNION SELECT key FROM modules WHERE instr(lower(key), ?) > 0 ORDER BY key",
+            (query, query + "\uffff", query),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def candidates(self, name: str) -> dict[str, str | None]:
+        return dict(
+            self.db.execute(
+                "SELECT key, versionKey FROM modules WHERE name = ? ORDER BY key",
+                (name,),
+            ).fetchall()
+        )
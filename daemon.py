@@ -0,0 +1,150 @@
+import os
+import io
+import sys
+import json
+import socket
+import threading
+import traceback
+import contextlib
+
+socketPath = os.environ.get("SDK_FRAME_DAEMON") or os.path.join(
+    os.path.expanduser("~"), ".cache", "sdk-frame", "cli.sock"
+)
+
+
+class SocketWriter(io.TextIOBase):
+    def __init__(self, stream, channel: str):
+        self.stream = stream
+        self.channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if text:
+            send(self.stream, {self.channel: text})
+        return len(text)
+
+
+def send(stream, message: dict):
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def _connect(path: str) -> socket.socket | None:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def _handle(conn: socket.socket, modulePath: str, handler) -> bool:
+    reader = conn.makefile("r", encoding="utf-8")
+    writer = conn.makefile("w", encoding="utf-8")
+    request = json.loads(reader.readline() or "{}")
+    if request.get("stop"):
+        send(writer, {"exit": 0})
+        return False
+    if request.get("modulePath") != modulePath:
+        send(writer, {"error": f"Daemon serves {modulePath}"})
+        return True
+    send(writer, {"ready": True})
+    cwd = os.getcwd()
+    stdin = sys.stdin
+    code = 0
+    try:
+        os.chdir(request["cwd"])
+        sys.stdin = reader
+        with contextlib.redirect_stdout(
+            SocketWriter(writer, "out")
+        ), contextlib.redirect_stderr(SocketWriter(writer, "err")):
+            try:
+                code = handler(request["args"])
+            except Exception:
+                traceback.print_exc()
+                code = 1
+    finally:
+        sys.stdin = stdin
+        os.chdir(cwd)
+    send(writer, {"exit": code})
+    return True
+
+
+def serve(path: str, modulePath: str, handler):
+    if os.path.exists(path):
+        running = _connect(path)
+        if running is not None:
+            running.close()
+            raise RuntimeError(f"Daemon already listening on {path}")
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen()
+    try:
+        serving = True
+        while serving:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    serving = _handle(conn, modulePath, handler)
+                except (OSError, ValueError):
+                    continue
+    finally:
+        server.close()
+        os.remove(path)
+
+
+def _pump_stdin(conn: socket.socket, writer):
+    try:
+        for line in sys.stdin:
+            writer.write(line)
+            writer.flush()
+        conn.shutdown(socket.SHUT_WR)
+    except (OSError, ValueError):
+        pass
+
+
+def forward(path: str, modulePath: str, cmdArgs: list[str]) -> int | None:
+    conn = _connect(path)
+    if conn is None:
+        return None
+    with conn:
+        reader = conn.makefile("r", encoding="utf-8")
+        writer = conn.makefile("w", encoding="utf-8")
+        send(
+            writer,
+            {"args": cmdArgs, "cwd": os.getcwd(), "modulePath": modulePath},
+        )
+        for line in reader:
+            message = json.loads(line)
+            if "ready" in message:
+                threading.Thread(
+                    target=_pump_stdin, args=(conn, writer), daemon=True
+                ).start()
+            elif "out" in message:
+                sys.stdout.write(message["out"])
+                sys.stdout.flush()
+            elif "err" in message:
+                sys.stderr.write(message["err"])
+                sys.stderr.flush()
+            elif "exit" in message:
+                return message["exit"]
+            else:
+                return None
+    return 1
+
+
+def stop(path: str) -> bool:
+    conn = _connect(path)
+    if conn is None:
+        return False
+    with conn:
+        writer = conn.makefile("w", encoding="utf-8")
+        send(writer, {"stop": True})
+        conn.makefile("r", encoding="utf-8").readline()
+    return True
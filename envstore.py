@@ -0,0 +1,169 @@
+import os
+import json
+import atexit
+import threading
+
+from . import logger
+
+_deleted = object()
+
+
+class EnvStore:
+    def __init__(
+        self,
+        path: str = "./env.json",
+        poll: float | None = 1.0,
+        flushDelay: float | None = 0.5,
+    ):
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_poll", poll)
+        object.__setattr__(self, "_flushDelay", flushDelay)
+        object.__setattr__(self, "_data", {})
+        object.__setattr__(self, "_pending", {})
+        object.__setattr__(self, "_watchers", [])
+        object.__setattr__(self, "_stamp", None)
+        object.__setattr__(self, "_timer", None)
+        object.__setattr__(self, "_closed", threading.Event())
+        object.__setattr__(self, "_lock", threading.RLock())
+        self._data.update(self._read())
+        if poll:
+            threading.Thread(
+                target=self._watch_file, name="sdk-env", daemon=True
+            ).start()
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        with self._lock:
+            if name in self._data:
+                return self._data[name]
+        raise AttributeError(f"'env' object has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        self.set(name, value)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self) -> dict:
+        stamp = self._file_stamp()
+        try:
+            with open(self._path, "r") as f:
+                envObj = json.load(f)
+        except FileNotFoundError:
+            envObj = {}
+        if not isinstance(envObj, dict):
+            raise ValueError(f"{self._path} does not contain a JSON object")
+        object.__setattr__(self, "_stamp", stamp)
+        return envObj
+
+    def _notify(self, changes: list[tuple]):
+        for key, old, new in changes:
+            for watchKey, callback in list(self._watchers):
+                if watchKey is None or watchKey == key:
+                    try:
+                        callback(key, old, new)
+                    except Exception as e:
+                        logger.Logger("Env").error(
+                            f"Env watcher for {key} failed: {e!r}"
+                        )
+
+    def _watch_file(self):
+        while not self._closed.wait(self._poll):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.Logger("Env").error(f"Env reload failed: {e!r}")
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def items(self) -> list[tuple]:
+        with self._lock:
+            return list(self._data.items())
+
+    def set(self, key, value):
+        with self._lock:
+            old = self._data.get(key)
+            self._data[key] = value
+            self._pending[key] = value
+            self._schedule_flush()
+        if old != value:
+            self._notify([(key, old, value)])
+
+    def delete(self, key):
+        with self._lock:
+            if key not in self._data:
+                return
+            old = self._data.pop(key)
+            self._pending[key] = _deleted
+            self._schedule_flush()
+        self._notify([(key, old, None)])
+
+    def watch(self, callback, key=None):
+        entry = (key, callback)
+        self._watchers.append(entry)
+        return lambda: self._watchers.remove(entry)
+
+    def _schedule_flush(self):
+        if self._flushDelay is None or self._timer is not None:
+            return
+        timer = threading.Timer(self._flushDelay, self.flush)
+        timer.daemon = True
+        object.__setattr__(self, "_timer", timer)
+        timer.start()
+
+    def flush(self):
+        with self._lock:
+            object.__setattr__(self, "_timer", None)
+            if not self._pending:
+                return
+            envObj = self._read()
+            for key, value in self._pending.items():
+                if value is _deleted:
+                    envObj.pop(key, None)
+                else:
+                    envObj[key] = value
+            with open(self._path + ".tmp", "w") as f:
+                json.dump(envObj, f, indent=2, ensure_ascii=False)
+            os.replace(self._path + ".tmp", self._path)
+            object.__setattr__(self, "_stamp", self._file_stamp())
+            self._pending.clear()
+
+    def reload(self):
+        with self._lock:
+            if self._file_stamp() == self._stamp:
+                return
+            try:
+                envObj = self._read()
+            except (OSError, ValueError):
+                return
+            changes = []
+            for key in set(envObj) | set(self._data):
+                if key in self._pending:
+                    continue
+                old, new = self._data.get(key), envObj.get(key)
+                if key not in envObj:
+                    del self._data[key]
+                elif key not in self._data or old != new:
+                    self._data[key] = new
+                else:
+                    continue
+                changes.append((key, old, new))
+        self._notify(changes)
+
+    def close(self):
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.cancel()
+        self.flush()
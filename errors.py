@@ -14,3 +14,27 @@ class InvalidModuleError(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class DownloadError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class RejectedTaskError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class ResolutionError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class WorkerError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
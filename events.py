@@ -0,0 +1,291 @@
+import time
+import fnmatch
+import asyncio
+import threading
+from collections import deque
+
+from . import util
+from . import errors
+from . import logger
+
+policies = ("block", "abort", "discard", "drop_oldest")
+
+
+class Event:
+    __slots__ = ("topic", "payload", "published")
+
+    def __init__(self, topic: str, payload, published: float):
+        self.topic = topic
+        self.payload = payload
+        self.published = published
+
+    def __repr__(self):
+        return f"Event({self.topic!r}, {self.payload!r})"
+
+
+class TopicStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.latency = 0.0
+        self.maxLatency = 0.0
+        self.first = None
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            elapsed = time.monotonic() - self.first if self.first else 0.0
+            return {
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "avgLatency": self.latency / (self.delivered or 1),
+                "maxLatency": self.maxLatency,
+                "rate": self.published / elapsed if elapsed else 0.0,
+            }
+
+
+class Subscription:
+    def __init__(
+        self,
+        bus,
+        pattern: str,
+        handler,
+        batch: bool,
+        batchSize: int,
+        maxQueue: int,
+        policy: str,
+    ):
+        if policy not in policies:
+            raise ValueError(f"Unknown overflow policy {policy}")
+        self.bus = bus
+        self.pattern = pattern
+        self.handler = handler
+        self.batch = batch
+        self.batchSize = batchSize if batch else 1
+        self.maxQueue = maxQueue
+        self.policy = policy
+        self.isAsync = asyncio.iscoroutinefunction(handler) or (
+            asyncio.iscoroutinefunction(getattr(handler, "__call__", None))
+        )
+        self.queue: deque[Event] = deque()
+        self.cond = threading.Condition()
+        self.draining = False
+        self.cancelled = False
+
+    def depth(self) -> int:
+        with self.cond:
+            return len(self.queue)
+
+    def cancel(self):
+        self.bus.unsubscribe(self)
+
+    def offer(self, events: list[Event]) -> int:
+        dropped = []
+        accepted = 0
+        with self.cond:
+            if self.cancelled:
+                return 0
+            for event in events:
+                if self.maxQueue and len(self.queue) >= self.maxQueue:
+                    self._kick()
+                    if self.policy == "block":
+                        if util.runtime.in_loop():
+                            raise errors.RejectedTaskError(
+                                f"Subscriber queue for {self.pattern} is full and "
+                                "cannot block an async runtime loop"
+                            )
+                        while len(self.queue) >= self.maxQueue and not self.cancelled:
+                            self.cond.wait()
+                        if self.cancelled:
+                            break
+                    elif self.policy == "abort":
+                        raise errors.RejectedTaskError(
+                            f"Subscriber queue for {self.pattern} is full"
+                        )
+                    elif self.policy == "discard":
+                        dropped.append(event)
+                        continue
+                    else:
+                        dropped.append(self.queue.popleft())
+                self.queue.append(event)
+                accepted += 1
+            if accepted:
+                self._kick()
+        for event in dropped:
+            stats = self.bus.topic_stats(event.topic)
+            with stats.lock:
+                stats.dropped += 1
+        return accepted
+
+    def _kick(self):
+        if self.draining:
+            return
+        self.draining = True
+        try:
+            if self.isAsync:
+                util.runtime.submit(self._drain_async())
+            else:
+                util.executor.submit(self._drain)
+        except BaseException:
+            self.draining = False
+            raise
+
+    def _take(self) -> list[Event]:
+        with self.cond:
+            events = []
+            while self.queue and len(events) < self.batchSize:
+                events.append(self.queue.popleft())
+            if not events:
+                self.draining = False
+            self.cond.notify_all()
+            return events
+
+    def _account(self, events: list[Event], failed: bool):
+        now = time.perf_counter()
+        for event in events:
+            stats = self.bus.topic_stats(event.topic)
+            latency = now - event.published
+            with stats.lock:
+                if failed:
+                    stats.failed += 1
+                    continue
+                stats.delivered += 1
+                stats.latency += latency
+                stats.maxLatency = max(stats.maxLatency, latency)
+
+    def _failed(self, e: Exception):
+        self.bus.logger.error(f"Event handler for {self.pattern} failed: {e!r}")
+
+    def _drain(self):
+        while events := self._take():
+            try:
+                if self.batch:
+                    self.handler(events)
+                else:
+                    self.handler(events[0])
+            except Exception as e:
+                self._account(events, True)
+                self._failed(e)
+            else:
+                self._account(events, False)
+
+    async def _drain_async(self):
+        while events := self._take():
+            try:
+                if self.batch:
+                    await self.handler(events)
+                else:
+                    await self.handler(events[0])
+            except Exception as e:
+                self._account(events, True)
+                self._failed(e)
+            else:
+                self._account(events, False)
+
+
+class EventBus:
+    def __init__(self):
+        self.subscriptions: list[Subscription] = []
+        self.stats_by_topic: dict[str, TopicStats] = {}
+        self.logger = logger.Logger("Events")
+        self._routes: dict[str, list[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def topic_stats(self, topic: str) -> TopicStats:
+        stats = self.stats_by_topic.get(topic)
+        if stats is None:
+            with self._lock:
+                stats = self.stats_by_topic.setdefault(topic, TopicStats())
+        return stats
+
+    def subscribe(
+        self,
+        pattern: str,
+        handler,
+        batch: bool = False,
+        batchSize: int = 100,
+        maxQueue: int = 10000,
+        policy: str = "drop_oldest",
+    ) -> Subscription:
+        subscription = Subscription(
+            self, pattern, handler, batch, batchSize, maxQueue, policy
+        )
+        with self._lock:
+            self.subscriptions.append(subscription)
+            self._routes = {}
+        return subscription
+
+    def on(self, pattern: str, **options):
+        def decorator(handler):
+            self.subscribe(pattern, handler, **options)
+            return handler
+
+        return decorator
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+            self._routes = {}
+        with subscription.cond:
+            subscription.cancelled = True
+            subscription.cond.notify_all()
+
+    def _route(self, topic: str) -> list[Subscription]:
+        routes = self._routes
+        subscribers = routes.get(topic)
+        if subscribers is None:
+            with self._lock:
+                subscribers = [
+                    x
+                    for x in self.subscriptions
+                    if x.pattern == topic or fnmatch.fnmatchcase(topic, x.pattern)
+                ]
+                self._routes[topic] = subscribers
+        return subscribers
+
+    def publish(self, topic: str, payload=None) -> int:
+        return self.publish_many(topic, [payload])
+
+    def publish_many(self, topic: str, payloads: list) -> int:
+        now = time.perf_counter()
+        events = [Event(topic, payload, now) for payload in payloads]
+        stats = self.topic_stats(topic)
+        with stats.lock:
+            if stats.first is None:
+                stats.first = time.monotonic()
+            stats.published += len(events)
+        return sum(subscription.offer(events) for subscription in self._route(topic))
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            topics = dict(self.stats_by_topic)
+        return {topic: stats.snapshot() for topic, stats in topics.items()}
+
+    def pending(self) -> int:
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        return sum(x.depth() + x.draining for x in subscriptions)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def shutdown(self, timeout: float | None = None) -> bool:
+        drained = self.flush(timeout)
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            self.unsubscribe(subscription)
+        return drained
+
+
+bus = EventBus()
@@ -0,0 +1,74 @@
+import os
+import json
+import marshal
+import zipfile
+import importlib.util
+
+from . import plan
+from . import errors
+from . import release
+
+
+def bytecode(source: bytes, filename: str) -> bytes:
+    try:
+        code = compile(source, filename, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        raise errors.InvalidModuleError(f"Cannot compile {filename}: {e}")
+    return (
+        importlib.util.MAGIC_NUMBER
+        + (0b01).to_bytes(4, "little")
+        + importlib.util.source_hash(source)
+        + marshal.dumps(code)
+    )
+
+
+def framework_entries(frameworkDir: str) -> list[tuple[str, str]]:
+    return [
+        (os.path.join(frameworkDir, x), f"{__package__}/{x}")
+        for x in sorted(os.listdir(frameworkDir))
+        if x.endswith(".py") and not x.startswith(".")
+    ]
+
+
+def module_entries(modulePath: str, order: list[str]) -> list[tuple[str, str]]:
+    entries = []
+    for module in order:
+        for file_path, arcname in release.zip_entries(os.path.join(modulePath, module)):
+            entries.append((file_path, f"{__package__}/modules/{arcname}"))
+    return entries
+
+
+def _write(zipf: zipfile.ZipFile, arcname: str, data: bytes):
+    info = zipfile.ZipInfo(arcname, date_time=release.zipTimestamp)
+    info.external_attr = 0o644 << 16
+    zipf.writestr(info, data)
+
+
+def freeze(frameworkDir: str, modulePath: str, target: str) -> dict:
+    loadPlan = plan.build(modulePath)
+    archivePath = os.path.abspath(target)
+    entries = framework_entries(frameworkDir) + module_entries(
+        modulePath, loadPlan["order"]
+    )
+    compiled = 0
+    with zipfile.ZipFile(target + ".tmp", "w", zipfile.ZIP_STORED) as zipf:
+        for file_path, arcname in entries:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            _write(zipf, arcname, data)
+            if arcname.endswith(".py"):
+                filename = os.path.join(archivePath, *arcname.split("/"))
+                _write(zipf, arcname + "c", bytecode(data, filename))
+                compiled += 1
+        _write(
+            zipf,
+            f"{__package__}/modules/{plan.planFile}",
+            json.dumps(loadPlan, ensure_ascii=False).encode("utf-8"),
+        )
+    os.replace(target + ".tmp", target)
+    return {
+        "modules": len(loadPlan["order"]),
+        "files": len(entries),
+        "compiled": compiled,
+        "size": os.path.getsize(target),
+    }
@@ -0,0 +1,142 @@
+import os
+import sys
+import ctypes
+import shutil
+import tempfile
+import py_compile
+from concurrent.futures import ProcessPoolExecutor
+
+from . import errors
+
+
+def _staging_root(modulePath: str) -> str:
+    stagingRoot = os.path.join(modulePath, ".staging")
+    os.makedirs(stagingRoot, exist_ok=True)
+    return stagingRoot
+
+
+def _rollback_dir(modulePath: str, moduleName: str) -> str:
+    rollbackRoot = os.path.join(modulePath, ".rollback")
+    os.makedirs(rollbackRoot, exist_ok=True)
+    return os.path.join(rollbackRoot, moduleName)
+
+
+def stage(archiveFile: str, modulePath: str) -> tuple[str, str]:
+    stagingDir = tempfile.mkdtemp(dir=_staging_root(modulePath))
+    try:
+        shutil.unpack_archive(archiveFile, stagingDir)
+        moduleFolders = [
+            x
+            for x in os.listdir(stagingDir)
+            if os.path.isdir(os.path.join(stagingDir, x))
+        ]
+        if len(moduleFolders) == 0:
+            raise errors.InvalidModuleError(f"No module found in {archiveFile}")
+        moduleName = moduleFolders[0]
+        if not moduleName.startswith("m_"):
+            os.rename(
+                os.path.join(stagingDir, moduleName),
+                os.path.join(stagingDir, "m_" + moduleName),
+            )
+            moduleName = "m_" + moduleName
+    except BaseException:
+        shutil.rmtree(stagingDir, ignore_errors=True)
+        raise
+    return os.path.join(stagingDir, moduleName), moduleName
+
+
+def discard(stagedModule: str):
+    shutil.rmtree(os.path.dirname(stagedModule), ignore_errors=True)
+
+
+def installed(modulePath: str, moduleName: str) -> bool:
+    return os.path.exists(os.path.join(modulePath, moduleName)) or os.path.exists(
+        os.path.join(modulePath, "d" + moduleName)
+    )
+
+
+def exchange(src: str, dst: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    renameat2 = getattr(ctypes.CDLL(None, use_errno=True), "renameat2", None)
+    if renameat2 is None:
+        return False
+    atFdCwd, renameExchange = -100, 2
+    return (
+        renameat2(atFdCwd, os.fsencode(src), atFdCwd, os.fsencode(dst), renameExchange)
+        == 0
+    )
+
+
+def swap(modulePath: str, stagedModule: str, moduleName: str):
+    targetDir = os.path.join(modulePath, moduleName)
+    disabledDir = os.path.join(modulePath, "d" + moduleName)
+    currentDir = None
+    if os.path.exists(targetDir):
+        currentDir = targetDir
+    elif os.path.exists(disabledDir):
+        currentDir = disabledDir
+    if currentDir is not None:
+        rollbackDir = _rollback_dir(modulePath, moduleName)
+        if os.path.exists(rollbackDir):
+            shutil.rmtree(rollbackDir)
+        if currentDir == targetDir and exchange(stagedModule, targetDir):
+            os.rename(stagedModule, rollbackDir)
+            discard(stagedModule)
+            return
+        # Without an atomic exchange the module is briefly missing here.
+        os.rename(currentDir, rollbackDir)
+    os.rename(stagedModule, targetDir)
+    discard(stagedModule)
+
+
+def rollback(modulePath: str, moduleName: str) -> bool:
+    rollbackDir = _rollback_dir(modulePath, moduleName)
+    if not os.path.exists(rollbackDir):
+        return False
+    stagingDir = tempfile.mkdtemp(dir=_staging_root(modulePath))
+    stagedModule = os.path.join(stagingDir, moduleName)
+    os.rename(rollbackDir, stagedModule)
+    swap(modulePath, stagedModule, moduleName)
+    return True
+
+
+def source_files(moduleDir: str) -> list[str]:
+    sourceFiles = []
+    for root, dirs, files in os.walk(moduleDir):
+        dirs[:] = sorted(
+            d for d in dirs if d != "__pycache__" and not d.startswith(".")
+        )
+        for file in sorted(files):
+            if file.endswith(".py") and not file.startswith("."):
+                sourceFiles.append(os.path.join(root, file))
+    return sourceFiles
+
+
+def compile_file(sourceFile: str) -> str | None:
+    try:
+        py_compile.compile(
+            sourceFile,
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+        )
+    except (py_compile.PyCompileError, OSError) as e:
+        return str(e).strip()
+    return None
+
+
+def precompile(moduleDirs: list[str]) -> dict[str, str]:
+    sourceFiles = [x for moduleDir in moduleDirs for x in source_files(moduleDir)]
+    workers = min(len(sourceFiles), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [compile_file(x) for x in sourceFiles]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(
+                    compile_file,
+                    sourceFiles,
+                    chunksize=max(1, len(sourceFiles) // (workers * 4)),
+                )
+            )
+    return {x: error for x, error in zip(sourceFiles, results) if error}
@@ -0,0 +1,304 @@
+import os
+import sys
+import time
+import asyncio
+import itertools
+import threading
+import importlib
+import traceback
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+
+from . import errors
+from . import logger
+
+defaultOptions = {
+    "timeout": 30.0,
+    "startTimeout": 60.0,
+    "stopTimeout": 5.0,
+    "restarts": 3,
+    "restartWindow": 60.0,
+    "shmThreshold": 1024 * 1024,
+}
+
+
+class SharedBuffer:
+    def __init__(self, name: str, size: int, mutable: bool):
+        self.name = name
+        self.size = size
+        self.mutable = mutable
+
+
+def pack(value, threshold: int):
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return value
+    view = memoryview(value).cast("B")
+    if view.nbytes < threshold:
+        return value
+    shm = shared_memory.SharedMemory(create=True, size=max(1, view.nbytes))
+    try:
+        shm.buf[: view.nbytes] = view
+    finally:
+        shm.close()
+    return SharedBuffer(shm.name, view.nbytes, isinstance(value, bytearray))
+
+
+def unpack(value):
+    if not isinstance(value, SharedBuffer):
+        return value
+    shm = shared_memory.SharedMemory(name=value.name)
+    try:
+        data = bytes(shm.buf[: value.size])
+    finally:
+        shm.close()
+        shm.unlink()
+    return bytearray(data) if value.mutable else data
+
+
+def _reply(conn, callId: int, ok: bool, value, threshold: int):
+    try:
+        conn.send((callId, ok, pack(value, threshold) if ok else value))
+    except Exception as e:
+        if ok:
+            error = errors.WorkerError(f"Unpicklable result: {e}")
+        else:
+            error = errors.WorkerError(
+                "".join(traceback.format_exception(value)).rstrip()
+            )
+        conn.send((callId, False, error))
+
+
+def _invoke(moduleMain, op: str, name: str, args, kwargs):
+    target = getattr(moduleMain, name)
+    if op == "getattr":
+        return target
+    result = target(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return result
+
+
+def _serve(conn, modulePath, package, name, loggingConfig, threshold):
+    from . import util
+    from . import loader
+    from . import envstore
+
+    sys.path.append(modulePath)
+    logger.configure(loggingConfig)
+    try:
+        sdk = loader.SDK()
+        if os.path.exists("./env.json"):
+            sdk.env = envstore.EnvStore("./env.json")
+        sdk.util = util
+        sdk.logger = logger.Logger("SDK")
+        module = importlib.import_module(package)
+        moduleMain = module.Main(sdk, logger.Logger(name))
+        if hasattr(moduleMain, "install"):
+            _invoke(moduleMain, "call", "install", (sdk,), {})
+        methods = [
+            x
+            for x in dir(moduleMain)
+            if not x.startswith("_") and callable(getattr(moduleMain, x))
+        ]
+    except BaseException as e:
+        conn.send(("error", "".join(traceback.format_exception(e)).rstrip()))
+        return
+    conn.send(("ready", methods))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        callId, op, method, args, kwargs = message
+        try:
+            args = [unpack(x) for x in args]
+            kwargs = {k: unpack(v) for k, v in kwargs.items()}
+            result = _invoke(moduleMain, op, method, args, kwargs)
+        except Exception as e:
+            _reply(conn, callId, False, e, threshold)
+        else:
+            _reply(conn, callId, True, result, threshold)
+    if hasattr(moduleMain, "shutdown"):
+        _invoke(moduleMain, "call", "shutdown", (), {})
+    logger.flush()
+
+
+class ModuleProxy:
+    def __init__(self, modulePath: str, package: str, name: str, options, log):
+        self._modulePath = modulePath
+        self._package = package
+        self._name = name
+        self._options = {
+            **defaultOptions,
+            **(options if isinstance(options, dict) else {}),
+        }
+        self._logger = log
+        self._lock = threading.RLock()
+        self._calls: dict[int, Future] = {}
+        self._seq = itertools.count()
+        self._restarts: deque = deque()
+        self._methods: list[str] = []
+        self._process = None
+        self._conn = None
+        self._closed = False
+        self._start()
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        conn, childConn = context.Pipe()
+        process = context.Process(
+            target=_serve,
+            args=(
+                childConn,
+                self._modulePath,
+                self._package,
+                self._name,
+                dict(logger._config),
+                self._options["shmThreshold"],
+            ),
+            name=f"sdk-{self._name}",
+            daemon=True,
+        )
+        process.start()
+        childConn.close()
+        try:
+            if not conn.poll(self._options["startTimeout"]):
+                raise errors.WorkerError(
+                    f"Module {self._package} worker start timed out"
+                )
+            status, payload = conn.recv()
+        except (EOFError, OSError):
+            status, payload = "error", f"exit code {process.exitcode}"
+        except errors.WorkerError:
+            self._kill(process, conn)
+            raise
+        if status != "ready":
+            self._kill(process, conn)
+            raise errors.WorkerError(f"Module {self._package} worker failed: {payload}")
+        self._process, self._conn, self._methods = process, conn, payload
+        threading.Thread(
+            target=self._read,
+            args=(conn, process),
+            name=f"sdk-{self._name}-reader",
+            daemon=True,
+        ).start()
+
+    def _kill(self, process, conn):
+        conn.close()
+        process.join(self._options["stopTimeout"])
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _read(self, conn, process):
+        while True:
+            try:
+                callId, ok, value = conn.recv()
+            except (EOFError, OSError):
+                break
+            future = self._calls.pop(callId, None)
+            if future is None:
+                unpack(value)
+                continue
+            if ok:
+                future.set_result(unpack(value))
+            else:
+                future.set_exception(value)
+        process.join(self._options["stopTimeout"])
+        with self._lock:
+            if self._process is not process:
+                return
+            pending = list(self._calls.values())
+            self._calls.clear()
+        if not self._closed:
+            self._logger.warning(
+                f"Worker for {self._package} exited with code {process.exitcode}"
+            )
+        for future in pending:
+            future.set_exception(
+                errors.WorkerError(f"Module {self._package} worker exited")
+            )
+
+    def _restart(self, reason: str):
+        with self._lock:
+            if self._closed:
+                raise errors.WorkerError(f"Module {self._package} worker is shut down")
+            now = time.monotonic()
+            while (
+                self._restarts
+                and now - self._restarts[0] > self._options["restartWindow"]
+            ):
+                self._restarts.popleft()
+            if len(self._restarts) >= self._options["restarts"]:
+                raise errors.WorkerError(
+                    f"Module {self._package} worker restarted too often: {reason}"
+                )
+            self._restarts.append(now)
+            self._logger.warning(f"Restart worker for {self._package}: {reason}")
+            process, conn = self._process, self._conn
+            self._process = None
+            pending = list(self._calls.values())
+            self._calls.clear()
+            process.kill()
+            self._kill(process, conn)
+            for future in pending:
+                future.set_exception(
+                    errors.WorkerError(f"Module {self._package} worker restarted")
+                )
+            self._start()
+
+    def _call(self, op: str, name: str, args, kwargs):
+        threshold = self._options["shmThreshold"]
+        with self._lock:
+            if self._closed:
+                raise errors.WorkerError(f"Module {self._package} worker is shut down")
+            if not self._process.is_alive():
+                self._restart(f"exit code {self._process.exitcode}")
+            callId = next(self._seq)
+            future = Future()
+            self._calls[callId] = future
+            self._conn.send(
+                (
+                    callId,
+                    op,
+                    name,
+                    [pack(x, threshold) for x in args],
+                    {k: pack(v, threshold) for k, v in kwargs.items()},
+                )
+            )
+        try:
+            return future.result(self._options["timeout"])
+        except FutureTimeoutError:
+            self._calls.pop(callId, None)
+            self._restart(f"{name} timed out")
+            raise TimeoutError(
+                f"Call {self._package}.{name} timed out after {self._options['timeout']}s"
+            )
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._methods:
+            return lambda *args, **kwargs: self._call("call", name, args, kwargs)
+        return self._call("getattr", name, (), {})
+
+    def __repr__(self):
+        pid = self._process.pid if self._process else None
+        return f"<ModuleProxy {self._package} pid={pid}>"
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            process, conn = self._process, self._conn
+        try:
+            conn.send(None)
+        except OSError:
+            pass
+        process.join(self._options["stopTimeout"])
+        self._kill(process, conn)
@@ -0,0 +1,93 @@
+import time
+import signal
+import threading
+from concurrent.futures import wait
+
+from . import util
+from . import events
+from . import logger
+
+defaultTimeout = 30.0
+_lock = threading.Lock()
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - time.monotonic())
+
+
+def drain_executor(executor, timeout: float) -> bool:
+    waiter = threading.Thread(
+        target=executor.shutdown, name="sdk-drain-executor", daemon=True
+    )
+    waiter.start()
+    waiter.join(timeout)
+    if waiter.is_alive():
+        executor.shutdown(wait=False, cancel_futures=True)
+        return False
+    return True
+
+
+def drain_runtime(runtime, timeout: float) -> bool:
+    with runtime._lock:
+        futures = list(runtime.futures)
+    _, pending = wait(futures, timeout)
+    runtime.shutdown(cancel=True, timeout=0.1)
+    return not pending
+
+
+def drain_scheduler(scheduler, timeout: float) -> bool:
+    if scheduler.shutdown(True, timeout):
+        return True
+    scheduler.shutdown(False, cancel=True)
+    return False
+
+
+def shutdown(sdk, timeout: float = defaultTimeout) -> dict:
+    with _lock:
+        if "_stopped" in sdk.__dict__:
+            return sdk.__dict__["_stopped"]
+        started = time.monotonic()
+        deadline = started + timeout
+        sdkLogger = sdk.__dict__.get("logger") or logger.Logger("SDK")
+        moduleLoader = sdk.__dict__.get("_loader")
+        stopped, overran = [], {}
+        if moduleLoader is not None:
+            stopped, overran = moduleLoader.shutdown(deadline)
+        drained = {
+            "events": events.bus.shutdown(_remaining(deadline)),
+            "scheduler": drain_scheduler(util.scheduler, _remaining(deadline)),
+            "runtime": drain_runtime(util.runtime, _remaining(deadline)),
+            "executor": drain_executor(util.executor, _remaining(deadline)),
+        }
+        for package, limit in overran.items():
+            sdkLogger.warning(f"Module {package} did not shut down within {limit:.2f}s")
+        for name, ok in drained.items():
+            if not ok:
+                sdkLogger.warning(f"Cancelled pending {name} work after {timeout}s")
+        util.restart()
+        env = sdk.__dict__.get("env")
+        if env is not None:
+            env.close()
+        result = {
+            "modules": stopped,
+            "overran": list(overran),
+            "drained": drained,
+            "elapsed": time.monotonic() - started,
+        }
+        sdk.__dict__["_stopped"] = result
+        logger.flush()
+        return result
+
+
+def _exit(signum, frame):
+    raise SystemExit(128 + signum)
+
+
+def install(sdk, timeout: float = defaultTimeout, signals=(signal.SIGTERM,)):
+    # Runs before concurrent.futures joins its workers at interpreter exit.
+    threading._register_atexit(lambda: shutdown(sdk, timeout))
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for signum in signals:
+        if signal.getsignal(signum) in (signal.SIG_DFL, None):
+            signal.signal(signum, _exit)
@@ -0,0 +1,529 @@
+import sys
+import time
+import asyncio
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import util
+from . import errors
+from . import logger
+from . import plan
+from . import report
+from . import lifecycle
+
+SimpleNamespace = type(sys.implementation)
+
+
+class SDK(SimpleNamespace):
+    def __getattr__(self, name):
+        moduleLoader = self.__dict__.get("_loader")
+        if name.startswith("_") or moduleLoader is None:
+            raise AttributeError(f"'sdk' object has no attribute '{name}'")
+        if name not in moduleLoader.names:
+            raise AttributeError(f"'sdk' object has no attribute '{name}'")
+        moduleLoader.load(moduleLoader.names[name])
+        return self.__dict__[name]
+
+    def __dir__(self):
+        moduleLoader = self.__dict__.get("_loader")
+        pending = list(moduleLoader.names.keys()) if moduleLoader else []
+        return sorted(set(super().__dir__()) | set(pending))
+
+    def preload(self, names=None):
+        moduleLoader = self.__dict__.get("_loader")
+        if moduleLoader is None:
+            return self
+        if names is None:
+            names = list(moduleLoader.names.keys())
+        packages = []
+        for name in names:
+            if name in self.__dict__:
+                continue
+            if name in moduleLoader.names:
+                packages.append(moduleLoader.names[name])
+            elif name in moduleLoader.dependencies:
+                packages.append(name)
+            else:
+                raise errors.InvalidModuleError(f"Module {name} not found")
+        moduleLoader.load_many(packages)
+        return self
+
+    def load(self, name: str):
+        return self.__dict__["_loader"].load_module(name)
+
+    def reload(self, name: str):
+        return self.__dict__["_loader"].reload(name)
+
+    def unload(self, name: str):
+        return self.__dict__["_loader"].unload(name)
+
+    def shutdown(self, timeout: float = lifecycle.defaultTimeout) -> dict:
+        return lifecycle.shutdown(self, timeout)
+
+
+def run_coroutines(coroutines: list):
+    async def gather():
+        return await asyncio.gather(*coroutines)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(gather())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, gather()).result()
+
+
+class ModuleLoader:
+    def __init__(
+        self,
+        sdk,
+        modulePath: str,
+        lazy: bool = False,
+        workers: int = 1,
+        cache: bool = True,
+    ):
+        self.sdk = sdk
+        self.modulePath = modulePath
+        self.lazy = lazy
+        self.workers = workers
+        self.cache = cache
+        self.order: list[str] = []
+        self.dependencies: dict[str, list[str]] = {}
+        self.packageNames: dict[str, str] = {}
+        self.infos: dict[str, dict] = {}
+        self.modules: dict[str, object] = {}
+        self.names: dict[str, str] = {}
+        self.loaded: set[str] = set()
+        self.instances: dict[str, object] = {}
+        self.booted = False
+        self.lock = threading.RLock()
+        self.profile: dict[str, dict] = {}
+        self.started = time.perf_counter()
+
+    def scan(self):
+        if self.modulePath not in sys.path:
+            sys.path.append(self.modulePath)
+        loadPlan = plan.read_frozen(self.modulePath)
+        if loadPlan is not None:
+            self.sdk.logger.info("Use frozen load plan")
+        else:
+            loadPlan = plan.read(self.modulePath) if self.cache else None
+            if loadPlan is None:
+                self.sdk.logger.info("Scan Dependencies")
+                loadPlan = plan.build(self.modulePath, importFallback=True)
+                if self.cache:
+                    plan.write(self.modulePath, loadPlan)
+            else:
+                self.sdk.logger.info("Use cached load plan")
+        self.order = loadPlan["order"]
+        self.dependencies = loadPlan["dependencies"]
+        self.packageNames = loadPlan["names"]
+        self.infos = loadPlan["infos"]
+
+        if self.lazy:
+            for module in self.order:
+                moduleName: str = self.packageNames[module]
+                if moduleName in dir(self.sdk):
+                    raise errors.InvalidModuleError(
+                        f"Module {module} has duplicate name"
+                    )
+                self.names[moduleName] = module
+            self.booted = True
+        return self.order
+
+    def rescan(self):
+        loadPlan = plan.read_frozen(self.modulePath)
+        if loadPlan is None:
+            loadPlan = plan.build(self.modulePath, importFallback=True)
+            if self.cache:
+                plan.write(self.modulePath, loadPlan)
+        self.order = loadPlan["order"]
+        self.dependencies = loadPlan["dependencies"]
+        self.packageNames = loadPlan["names"]
+        self.infos = {**self.infos, **loadPlan["infos"]}
+        if self.lazy:
+            self.names = {
+                self.packageNames[module]: module
+                for module in self.order
+                if module not in self.loaded
+            }
+        importlib.invalidate_caches()
+        return self.order
+
+    def resolve(self, name: str) -> str:
+        if name in self.dependencies or name in self.loaded:
+            return name
+        for package, moduleName in self.packageNames.items():
+            if moduleName == name:
+                return package
+        for package in self.loaded:
+            if self.infos[package]["name"] == name:
+                return package
+        raise errors.InvalidModuleError(f"Module {name} not found")
+
+    def dependents(self, packages: list[str], dependencies=None) -> set[str]:
+        dependencies = self.dependencies if dependencies is None else dependencies
+        result = set(packages)
+        changed = True
+        while changed:
+            changed = False
+            for package, deps in dependencies.items():
+                if package not in result and any(dep in result for dep in deps):
+                    result.add(package)
+                    changed = True
+        return result
+
+    def module(self, package: str):
+        if package not in self.modules:
+            started = self._clock()
+            self.modules[package] = __import__(package)
+            self._record(package, "import", started)
+        return self.modules[package]
+
+    def _clock(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _timing(self, package: str) -> dict:
+        return self.profile.setdefault(package, report.new_timing())
+
+    def _record(self, package: str, phase: str, started: float):
+        duration = self._clock() - started
+        timing = self._timing(package)
+        timing[phase] += duration
+        timing["spans"].append((phase, started, duration, threading.get_ident()))
+
+    def _begin(self, package: str, requested: float):
+        timing = self._timing(package)
+        timing["start"] = self._clock()
+        ready = max(
+            (
+                self._timing(dep)["end"] or requested
+                for dep in self.dependencies[package]
+            ),
+            default=requested,
+        )
+        timing["wait"] = max(0.0, ready - requested)
+        if timing["wait"]:
+            timing["spans"].append(
+                ("wait", requested, timing["wait"], threading.get_ident())
+            )
+
+    def load(self, package: str, requested: float | None = None):
+        with self.lock:
+            if package in self.loaded:
+                return
+            if requested is None:
+                requested = self._clock()
+            for dep in self.dependencies[package]:
+                self.load(dep)
+            self._begin(package, requested)
+            self._check(package)
+            moduleMain, pending = self._construct(package)
+            if pending is not None:
+                self._installed(package, run_coroutines([pending])[0])
+            self._bind(package, moduleMain)
+
+    def load_many(self, packages: list[str]):
+        with self.lock:
+            requested = self._clock()
+            pending: set[str] = set()
+            stack = list(packages)
+            while stack:
+                module = stack.pop()
+                if module in pending or module in self.loaded:
+                    continue
+                pending.add(module)
+                stack.extend(self.dependencies[module])
+            if self.workers <= 1:
+                for module in self.order:
+                    if module in pending:
+                        self.load(module, requested)
+                return self.sdk
+            levels = util.topological_levels(
+                list(pending),
+                {m: [d for d in self.dependencies[m] if d in pending] for m in pending},
+                errors.CycleDependencyError,
+            )
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for level in levels:
+                    self._load_level(level, pool, requested)
+        return self.sdk
+
+    def load_all(self):
+        self.load_many(self.order)
+        self.booted = True
+        return self.sdk
+
+    def load_module(self, name: str):
+        with self.lock:
+            self.rescan()
+            return self.load_many([self.resolve(name)])
+
+    def _shutdown(
+        self, package: str, moduleMain: object, timeout: float | None = None
+    ) -> bool:
+        shutdown = getattr(moduleMain, "shutdown", None)
+        if shutdown is None:
+            return True
+        overran = []
+
+        def call():
+            try:
+                if asyncio.iscoroutinefunction(shutdown):
+                    run_coroutines([asyncio.wait_for(shutdown(), timeout)])
+                else:
+                    shutdown()
+            except TimeoutError:
+                overran.append(package)
+            except Exception as e:
+                self.sdk.logger.error(f"Module {package} failed to shut down: {e}")
+
+        if timeout is None:
+            call()
+            return True
+        thread = threading.Thread(
+            target=call, name=f"sdk-shutdown-{package}", daemon=True
+        )
+        thread.start()
+        thread.join(timeout)
+        return not (thread.is_alive() or overran)
+
+    def shutdown(
+        self, deadline: float, moduleTimeout: float = 5.0
+    ) -> tuple[list[str], dict[str, float]]:
+        with self.lock:
+            packages = [x for x in self.loaded if x not in self.order]
+            packages += [x for x in self.order if x in self.loaded]
+            self.names = {}
+            stopped, overran = [], {}
+            for package in reversed(packages):
+                moduleInfo = self.infos[package]
+                limit = min(
+                    moduleInfo.get("shutdownTimeout", moduleTimeout),
+                    max(0.0, deadline - time.monotonic()),
+                )
+                self.sdk.logger.info(f"Shut down {package}")
+                moduleMain = self._unbind(package, moduleInfo["name"])
+                if not self._shutdown(package, moduleMain, limit):
+                    overran[package] = limit
+                stopped.append(package)
+            self.booted = False
+            return stopped, overran
+
+    def _forget(self, package: str) -> dict:
+        self.modules.pop(package, None)
+        self.profile.pop(package, None)
+        return {
+            name: sys.modules.pop(name)
+            for name in list(sys.modules)
+            if name == package or name.startswith(package + ".")
+        }
+
+    def _unbind(self, package: str, name: str):
+        moduleMain = self.instances.pop(package, None)
+        if name in self.sdk.__dict__ and self.sdk.__dict__[name] is moduleMain:
+            delattr(self.sdk, name)
+        self.loaded.discard(package)
+        return moduleMain
+
+    def unload(self, name: str) -> list[str]:
+        with self.lock:
+            package = self.resolve(name)
+            affected = [
+                module
+                for module in self.order
+                if module in self.dependents([package]) and module in self.loaded
+            ]
+            for module in reversed(affected):
+                self.sdk.logger.info(f"Unload {module}")
+                moduleMain = self._unbind(module, self.infos[module]["name"])
+                self._shutdown(module, moduleMain)
+                self._forget(module)
+            return affected
+
+    def reload(self, name: str):
+        with self.lock:
+            package = self.resolve(name)
+            previous = dict(self.dependencies)
+            graph = (
+                self.order,
+                self.dependencies,
+                self.infos,
+                self.packageNames,
+                dict(self.names),
+            )
+            oldNames = {x: self.infos[x]["name"] for x in self.loaded}
+            self.rescan()
+            if package not in self.loaded:
+                return self.load_many([package])
+            closure = self.dependents([package], {**previous, **self.dependencies})
+            closure &= self.loaded
+            affected = [x for x in self.order if x in closure]
+            removed = [x for x in closure if x not in self.dependencies]
+            missing = [
+                dep
+                for module in affected
+                for dep in self.dependencies[module]
+                if dep not in self.loaded
+            ]
+            old = {x: self.instances[x] for x in closure}
+            loadedBefore = set(self.loaded)
+            saved = {x: self._forget(x) for x in affected}
+            constructed = []
+            try:
+                if missing:
+                    self.load_many(missing)
+                for module in affected:
+                    self.sdk.logger.info(f"Reload {module}")
+                    self.loaded.discard(module)
+                    if not self.hosted(module) and "Main" not in dir(
+                        self.module(module)
+                    ):
+                        raise errors.InvalidModuleError(
+                            f"Module {module} has no Main class"
+                        )
+                    moduleMain, pending = self._construct(module)
+                    if pending is not None:
+                        self._installed(module, run_coroutines([pending])[0])
+                    constructed.append(module)
+                    self._bind(module, moduleMain)
+            except BaseException:
+                for module in reversed(constructed):
+                    moduleMain = self._unbind(module, self.infos[module]["name"])
+                    self._shutdown(module, moduleMain)
+                added = [
+                    x for x in self.order if x in self.loaded and x not in loadedBefore
+                ]
+                for module in reversed(added):
+                    moduleMain = self._unbind(module, self.infos[module]["name"])
+                    self._shutdown(module, moduleMain)
+                    self._forget(module)
+                (
+                    self.order,
+                    self.dependencies,
+                    self.infos,
+                    self.packageNames,
+                    self.names,
+                ) = graph
+                for module in affected:
+                    self._forget(module)
+                    sys.modules.update(saved[module])
+                    if module in saved[module]:
+                        self.modules[module] = saved[module][module]
+                    self.instances[module] = old[module]
+                    self.loaded.add(module)
+                    setattr(self.sdk, oldNames[module], old[module])
+                raise
+            for module in affected:
+                if oldNames[module] != self.infos[module]["name"]:
+                    delattr(self.sdk, oldNames[module])
+            for module in removed:
+                self._unbind(module, oldNames[module])
+                self._forget(module)
+            for module in reversed(self.order + removed):
+                if module in old:
+                    self._shutdown(module, old[module])
+            return self.sdk
+
+    def _load_level(self, level: list[str], pool: ThreadPoolExecutor, requested: float):
+        levelNames: set[str] = set()
+        for package in level:
+            self._begin(package, requested)
+            self._check(package)
+            moduleName: str = self.infos[package]["name"]
+            if moduleName in levelNames:
+                raise errors.InvalidModuleError(f"Module {package} has duplicate name")
+            levelNames.add(moduleName)
+        futures = [pool.submit(self._construct, package) for package in level]
+        results = [future.result() for future in futures]
+        asyncPackages = [
+            package
+            for package, (_, pending) in zip(level, results)
+            if pending is not None
+        ]
+        if asyncPackages:
+            installed = pool.submit(
+                run_coroutines,
+                [pending for _, pending in results if pending is not None],
+            ).result()
+            for package, result in zip(asyncPackages, installed):
+                self._installed(package, result)
+        for package, (moduleMain, _) in zip(level, results):
+            self._bind(package, moduleMain)
+
+    def hosted(self, package: str) -> bool:
+        return bool(self.infos[package].get("process"))
+
+    def _check(self, package: str):
+        moduleInfo: dict = self.infos[package]
+        if self.hosted(package):
+            module, modulePackage = None, package
+        else:
+            module: object = self.module(package)
+            modulePackage: str = module.__package__
+        self.sdk.logger.info("Load {} -> {}".format(modulePackage, moduleInfo["name"]))
+        if moduleInfo["name"] in vars(self.sdk) or (
+            not self.lazy and moduleInfo["name"] in dir(self.sdk)
+        ):
+            raise errors.InvalidModuleError(
+                f"Module {modulePackage} has duplicate name"
+            )
+        if module is not None and "Main" not in dir(module):
+            raise errors.InvalidModuleError(f"Module {modulePackage} has no Main class")
+
+    def _construct(self, package: str):
+        moduleLogger = logger.Logger(self.infos[package]["name"])
+        if self.hosted(package):
+            from . import isolate
+
+            started = self._clock()
+            moduleMain = isolate.ModuleProxy(
+                self.modulePath,
+                package,
+                self.infos[package]["name"],
+                self.infos[package]["process"],
+                moduleLogger,
+            )
+            self._record(package, "construct", started)
+            return moduleMain, None
+        module: object = self.module(package)
+        started = self._clock()
+        moduleMain: object = module.Main(self.sdk, moduleLogger)
+        self._record(package, "construct", started)
+        if not hasattr(moduleMain, "install"):
+            return moduleMain, None
+        if asyncio.iscoroutinefunction(moduleMain.install):
+            return moduleMain, self._timed_install(
+                package, moduleMain.install(self.sdk)
+            )
+        started = self._clock()
+        installed = moduleMain.install(self.sdk)
+        self._record(package, "install", started)
+        self._installed(package, installed)
+        return moduleMain, None
+
+    async def _timed_install(self, package: str, coroutine):
+        started = self._clock()
+        try:
+            return await coroutine
+        finally:
+            self._record(package, "install", started)
+
+    def _installed(self, package: str, installed):
+        if installed is self.sdk:
+            return
+        if self.lazy or self.workers > 1 or self.booted:
+            raise errors.InvalidModuleError(
+                f"Module {package} must return sdk from install in lazy or parallel mode or after init"
+            )
+        self.sdk = installed
+
+    def _bind(self, package: str, moduleMain: object):
+        moduleInfo: dict = self.infos[package]
+        setattr(moduleMain, "moduleInfo", moduleInfo)
+        setattr(self.sdk, moduleInfo["name"], moduleMain)
+        self.instances[package] = moduleMain
+        self.names.pop(moduleInfo["name"], None)
+        self.loaded.add(package)
+        self._timing(package)["end"] = self._clock()
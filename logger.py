@@ -1,68 +1,300 @@
-import logging
-
-
-class Logger:
-    def __init__(self, quoter: str):
-        self.quoter = quoter
-        self._init_logger()
-
-    def _init_logger(self):
-        self.logger = logging.getLogger(self.quoter)
-        self.logger.setLevel(logging.DEBUG)
-
-        if not self.logger.handlers:
-            color_map = {
-                "PINK": "\033[35m",
-                "DEBUG": "\033[94m",
-                "INFO": "\033[92m",
-                "WARNING": "\033[93m",
-                "ERROR": "\033[91m",
-                "RESET": "\033[0m",
-            }
-            log_format = f"[%(levelname)s] [{color_map['PINK']}{self.quoter}{color_map['RESET']}] %(message)s"
-
-            class ColoredFormatter(logging.Formatter):
-                def format(self, record):
-                    levelname = record.levelname
-                    if levelname in color_map:
-                        record.levelname = (
-                            f"{color_map[levelname]}{levelname}{color_map['RESET']}"
-                        )
-                    return super().format(record)
-
-            console_handler = logging.StreamHandler()
-            formatter = ColoredFormatter(log_format)
-            console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
-
-    def debug(self, msg, *args, **kwargs):
-        if args or kwargs:
-            self.logger.debug(
-                msg % args if args else msg.format(*args, **kwargs), **kwargs
-            )
-        else:
-            self.logger.debug(msg, **kwargs)
-
-    def info(self, msg, *args, **kwargs):
-        if args or kwargs:
-            self.logger.info(
-                msg % args if args else msg.format(*args, **kwargs), **kwargs
-            )
-        else:
-            self.logger.info(msg, **kwargs)
-
-    def warning(self, msg, *args, **kwargs):
-        if args or kwargs:
-            self.logger.warning(
-                msg % args if args else msg.format(*args, **kwargs), **kwargs
-            )
-        else:
-            self.logger.warning(msg, **kwargs)
-
-    def error(self, msg, *args, **kwargs):
-        if args or kwargs:
-            self.logger.error(
-                msg % args if args else msg.format(*args, **kwargs), **kwargs
-            )
-        else:
-            self.logger.error(msg, **kwargs)
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import weakref
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+
+color_map = {
+    "PINK": "\033[35m",
+    "DEBUG": "\033[94m",
+    "INFO": "\033[92m",
+    "WARNING": "\033[93m",
+    "ERROR": "\033[91m",
+    "RESET": "\033[0m",
+}
+log_format = (
+    f"[%(levelname)s] [{color_map['PINK']}%(name)s{color_map['RESET']}] %(message)s"
+)
+file_format = "%(asctime)s [%(levelname)s] [%(name)s] %(message)s"
+logging_kwargs = ("exc_info", "stack_info", "stacklevel", "extra")
+
+_config = {
+    "async": False,
+    "level": "DEBUG",
+    "levels": {},
+    "file": None,
+    "format": "text",
+    "sample": {},
+    "rateLimit": None,
+    "collapse": False,
+}
+_loggers: dict[str, logging.Logger] = {}
+_handlers: list[logging.Handler] = []
+_instances: weakref.WeakSet = weakref.WeakSet()
+_queueHandler = None
+_listener = None
+_lock = threading.RLock()
+
+
+class ColoredFormatter(logging.Formatter):
+    def format(self, record):
+        levelname = record.levelname
+        if levelname in color_map:
+            record = logging.makeLogRecord(record.__dict__)
+            record.levelname = f"{color_map[levelname]}{levelname}{color_map['RESET']}"
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "module": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in getattr(record, "fields", {}).items():
+            if key in entry or key == "fields":
+                entry.setdefault("fields", {})[key] = value
+            else:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BraceMessage:
+    def __init__(self, msg, kwargs):
+        self.msg = msg
+        self.kwargs = kwargs
+
+    def __str__(self):
+        try:
+            return str(self.msg).format(**self.kwargs)
+        except (KeyError, IndexError, ValueError, AttributeError):
+            return str(self.msg)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+
+def level_for(name: str) -> int:
+    level = _config["levels"].get(name, _config["level"])
+    if isinstance(level, str):
+        return logging.getLevelName(level.upper())
+    return level
+
+
+def _sinks() -> list[logging.Handler]:
+    structured = _config["format"] == "json"
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(
+        JsonFormatter() if structured else ColoredFormatter(log_format)
+    )
+    sinks = [console_handler]
+    fileConfig = _config["file"]
+    if fileConfig:
+        file_handler = logging.handlers.RotatingFileHandler(
+            fileConfig["path"],
+            maxBytes=fileConfig.get("maxBytes", 10 * 1024 * 1024),
+            backupCount=fileConfig.get("backupCount", 5),
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(
+            JsonFormatter() if structured else logging.Formatter(file_format)
+        )
+        sinks.append(
+            logging.handlers.MemoryHandler(
+                fileConfig.get("bufferSize", 100),
+                flushLevel=logging.ERROR,
+                target=file_handler,
+            )
+        )
+    return sinks
+
+
+def _attach(log: logging.Logger):
+    targets = [_queueHandler] if _queueHandler is not None else _handlers
+    for handler in list(log.handlers):
+        if getattr(handler, "sdkHandler", False) and handler not in targets:
+            log.removeHandler(handler)
+    for handler in targets:
+        if handler not in log.handlers:
+            log.addHandler(handler)
+    log.setLevel(level_for(log.name))
+
+
+def _close():
+    global _queueHandler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        target = getattr(handler, "target", None)
+        handler.flush()
+        handler.close()
+        if target is not None:
+            target.close()
+    _handlers.clear()
+    _queueHandler = None
+
+
+def configure(config: dict | None = None):
+    global _queueHandler, _listener
+    with _lock:
+        previous = dict(_config)
+        _config.update(config or {})
+        try:
+            sinks = _sinks()
+        except Exception:
+            _config.clear()
+            _config.update(previous)
+            raise
+        _close()
+        _handlers.extend(sinks)
+        for handler in _handlers:
+            handler.sdkHandler = True
+        if _config["async"]:
+            logQueue = queue.SimpleQueue()
+            _queueHandler = LazyQueueHandler(logQueue)
+            _queueHandler.sdkHandler = True
+            _listener = logging.handlers.QueueListener(
+                logQueue, *_handlers, respect_handler_level=True
+            )
+            _listener.start()
+        for log in _loggers.values():
+            _attach(log)
+
+
+def _release():
+    for instance in list(_instances):
+        instance._release()
+
+
+def flush():
+    _release()
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+        for handler in _handlers:
+            handler.flush()
+
+
+def _stop():
+    global _listener
+    _release()
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in _handlers:
+            handler.flush()
+
+
+atexit.register(_stop)
+
+
+class Logger:
+    def __init__(self, quoter: str):
+        self.quoter = quoter
+        self._lock = threading.Lock()
+        self._last = None
+        self._repeats = 0
+        self._dropped = 0
+        self._tokens = None
+        self._stamp = time.monotonic()
+        self._init_logger()
+        _instances.add(self)
+
+    def _init_logger(self):
+        self.logger = logging.getLogger(self.quoter)
+        with _lock:
+            if not _handlers:
+                configure()
+            _loggers[self.quoter] = self.logger
+            _attach(self.logger)
+
+    def _admit(self, level, msg, args, kwargs) -> bool:
+        sample = _config["sample"].get(logging.getLevelName(level).lower())
+        if sample is not None and random.random() >= sample:
+            return False
+        rateLimit = _config["rateLimit"]
+        repeats = dropped = 0
+        with self._lock:
+            if _config["collapse"]:
+                key = (level, msg, args, dict(kwargs))
+                try:
+                    repeated = key == self._last
+                except Exception:
+                    repeated = False
+                if repeated:
+                    self._repeats += 1
+                    return False
+                repeats, self._repeats = self._repeats, 0
+                self._last = key
+            if rateLimit:
+                now = time.monotonic()
+                burst = rateLimit.get("burst", rateLimit["rate"])
+                if self._tokens is None:
+                    self._tokens = burst
+                self._tokens = min(
+                    burst, self._tokens + (now - self._stamp) * rateLimit["rate"]
+                )
+                self._stamp = now
+                if self._tokens < 1:
+                    self._dropped += 1
+                    return False
+                self._tokens -= 1
+                dropped, self._dropped = self._dropped, 0
+        if repeats:
+            self.logger._log(level, "suppressed %d repeated messages", (repeats,))
+        if dropped:
+            self.logger._log(
+                logging.WARNING, "suppressed %d messages over rate limit", (dropped,)
+            )
+        return True
+
+    def _release(self):
+        with self._lock:
+            repeats, self._repeats = self._repeats, 0
+            dropped, self._dropped = self._dropped, 0
+            level = self._last[0] if self._last else logging.INFO
+            self._last = None
+        if repeats:
+            self.logger._log(level, "suppressed %d repeated messages", (repeats,))
+        if dropped:
+            self.logger._log(
+                logging.WARNING, "suppressed %d messages over rate limit", (dropped,)
+            )
+
+    def _log(self, level, msg, args, kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.ERROR and not self._admit(level, msg, args, kwargs):
+            return
+        options = {k: kwargs.pop(k) for k in logging_kwargs if k in kwargs}
+        if kwargs:
+            options["extra"] = {**options.get("extra", {}), "fields": kwargs}
+        if not args and kwargs:
+            msg = BraceMessage(msg, kwargs)
+        self.logger._log(level, msg, args, **options)
+
+    def debug(self, msg, *args, **kwargs):
+        self._log(logging.DEBUG, msg, args, kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self._log(logging.INFO, msg, args, kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self._log(logging.WARNING, msg, args, kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self._log(logging.ERROR, msg, args, kwargs)
@@ -0,0 +1,77 @@
+import os
+import ast
+import json
+import importlib
+
+from . import errors
+from . import logger
+
+manifestFile = "module.json"
+
+
+def files(moduleDir: str) -> list[str]:
+    return [
+        os.path.join(moduleDir, manifestFile),
+        os.path.join(moduleDir, "__init__.py"),
+    ]
+
+
+def read(moduleDir: str) -> dict:
+    modulePackage = os.path.basename(os.path.normpath(moduleDir))
+    manifestPath = os.path.join(moduleDir, manifestFile)
+    if os.path.exists(manifestPath):
+        try:
+            with open(manifestPath, "r", encoding="utf-8") as f:
+                moduleInfo = json.load(f)
+        except ValueError as e:
+            raise errors.InvalidModuleError(
+                f"Module {modulePackage} has invalid {manifestFile}: {e}"
+            )
+    else:
+        moduleInfo = extract(os.path.join(moduleDir, "__init__.py"), modulePackage)
+    if not isinstance(moduleInfo, dict):
+        raise errors.InvalidModuleError(
+            f"Module {modulePackage} has invalid moduleInfo"
+        )
+    return moduleInfo
+
+
+def load(moduleDir: str) -> dict:
+    try:
+        return read(moduleDir)
+    except errors.InvalidModuleError as e:
+        modulePackage = os.path.basename(os.path.normpath(moduleDir))
+        try:
+            moduleInfo = importlib.import_module(modulePackage).moduleInfo
+        except Exception:
+            raise e
+        if not isinstance(moduleInfo, dict):
+            raise e
+        logger.Logger("SDK").warning(f"{e.message}; imported it to read moduleInfo")
+        return moduleInfo
+
+
+def extract(initFile: str, modulePackage: str) -> dict:
+    try:
+        with open(initFile, "rb") as f:
+            tree = ast.parse(f.read(), filename=initFile)
+    except (OSError, SyntaxError) as e:
+        raise errors.InvalidModuleError(f"Module {modulePackage} is unreadable: {e}")
+    moduleInfoNode = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        if any(isinstance(x, ast.Name) and x.id == "moduleInfo" for x in targets):
+            moduleInfoNode = node.value
+    if moduleInfoNode is None:
+        raise errors.InvalidModuleError(f"Module {modulePackage} has no moduleInfo")
+    try:
+        return ast.literal_eval(moduleInfoNode)
+    except ValueError:
+        raise errors.InvalidModuleError(
+            f"Module {modulePackage} moduleInfo is not a literal, add a {manifestFile}"
+        )
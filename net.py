@@ -0,0 +1,142 @@
+import os
+import hashlib
+from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+
+from . import errors
+
+if TYPE_CHECKING:
+    import requests
+
+userAgent = "SDK Frame CLI"
+timeout = (5, 30)
+retries = 3
+workers = 8
+chunkSize = 1024 * 1024
+
+_session = None
+
+
+def session() -> "requests.Session":
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=workers, pool_maxsize=workers, max_retries=retry
+        )
+        _session = requests.Session()
+        _session.headers["User-Agent"] = userAgent
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def fetch_origin(origin: str, cached: dict | None = None) -> dict:
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("lastModified"):
+            headers["If-Modified-Since"] = cached["lastModified"]
+    import requests
+
+    try:
+        response = session().get(origin, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            return {"status": "not-modified"}
+        response.raise_for_status()
+        content = response.json()
+    except (requests.RequestException, ValueError) as e:
+        return {"status": "error", "error": str(e)}
+    return {
+        "status": "ok",
+        "content": content,
+        "etag": response.headers.get("ETag"),
+        "lastModified": response.headers.get("Last-Modified"),
+    }
+
+
+def fetch_origins(origins: list[str], originCache: dict) -> dict[str, dict]:
+    if not origins:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(origins))) as pool:
+        futures = {
+            origin: pool.submit(fetch_origin, origin, originCache.get(origin))
+            for origin in origins
+        }
+        return {origin: future.result() for origin, future in futures.items()}
+
+
+def _resume_offset(partFile: str, digest) -> int:
+    if not os.path.exists(partFile):
+        return 0
+    with open(partFile, "rb") as f:
+        while chunk := f.read(chunkSize):
+            digest.update(chunk)
+    return os.path.getsize(partFile)
+
+
+def _fetch_file(url: str, partFile: str, digest):
+    offset = _resume_offset(partFile, digest)
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session().get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416 and offset:
+            return digest
+        if response.status_code == 206 and offset:
+            mode = "ab"
+        else:
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            mode = "wb"
+        with open(partFile, mode, buffering=chunkSize) as f:
+            for chunk in response.iter_content(chunk_size=chunkSize):
+                digest.update(chunk)
+                f.write(chunk)
+    return digest
+
+
+def download(url: str, targetFile: str, sha256: str | None = None) -> str:
+    import requests
+
+    partFile = targetFile + ".part"
+    for attempt in range(retries + 1):
+        try:
+            digest = _fetch_file(url, partFile, hashlib.sha256())
+            break
+        except requests.HTTPError as e:
+            raise errors.DownloadError(f"Download {url} failed: {e}")
+        except requests.RequestException as e:
+            if attempt == retries:
+                raise errors.DownloadError(f"Download {url} failed: {e}")
+    if sha256 and digest.hexdigest() != sha256.lower():
+        os.remove(partFile)
+        raise errors.DownloadError(f"Checksum mismatch for {url}")
+    os.replace(partFile, targetFile)
+    return digest.hexdigest()
+
+
+def download_many(jobs: dict[str, tuple], callback=None) -> dict[str, object]:
+    def run(key, job):
+        digest = download(*job)
+        return callback(key, digest) if callback else digest
+
+    if not jobs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {key: pool.submit(run, key, job) for key, job in jobs.items()}
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                results[key] = e
+        return results
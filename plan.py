@@ -0,0 +1,134 @@
+import os
+import json
+import zipimport
+
+from . import util
+from . import errors
+from . import manifest
+from . import requirement
+
+planVersion = 2
+planFile = ".plan-cache.json"
+
+
+def installed_modules(modulePath: str) -> list[str]:
+    return [
+        os.path.basename(x)
+        for x in os.listdir(modulePath)
+        if os.path.isdir(os.path.join(modulePath, x)) and x.startswith("m_")
+    ]
+
+
+def fingerprint(modulePath: str, modules: list[str]) -> dict:
+    result = {}
+    for module in sorted(modules):
+        result[module] = []
+        for moduleFile in manifest.files(os.path.join(modulePath, module)):
+            try:
+                stat = os.stat(moduleFile)
+                result[module].append([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                result[module].append(None)
+    return result
+
+
+def build(modulePath: str, importFallback: bool = False) -> dict:
+    sdkInstalledModules = installed_modules(modulePath)
+    readInfo = manifest.load if importFallback else manifest.read
+    sdkModuleInfos = {
+        module: readInfo(os.path.join(modulePath, module))
+        for module in sdkInstalledModules
+    }
+    sdkModuleDependencies = {}
+    for module in sdkInstalledModules:
+        moduleSpecs: list = sdkModuleInfos[module]["dependencies"]
+        moduleDependecies: list[str] = [
+            requirement.installed_alternative(dep, sdkModuleInfos)
+            for dep in moduleSpecs
+        ]
+        if None in moduleDependecies:
+            raise errors.InvalidDependencyError(
+                f"Invalid module dependency for module {module}: {moduleSpecs}"
+            )
+        sdkModuleDependencies[module] = moduleDependecies
+    order = util.topological_sort(
+        sdkInstalledModules, sdkModuleDependencies, errors.CycleDependencyError
+    )
+    names = {}
+    for module in order:
+        moduleName: str = sdkModuleInfos[module]["name"]
+        if moduleName in names.values():
+            raise errors.InvalidModuleError(f"Module {module} has duplicate name")
+        names[module] = moduleName
+    return {
+        "version": planVersion,
+        "fingerprint": fingerprint(modulePath, sdkInstalledModules),
+        "order": order,
+        "dependencies": sdkModuleDependencies,
+        "names": names,
+        "infos": sdkModuleInfos,
+    }
+
+
+def read(modulePath: str):
+    try:
+        with open(os.path.join(modulePath, planFile), "r") as f:
+            loadPlan = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(loadPlan, dict) or loadPlan.get("version") != planVersion:
+        return None
+    if loadPlan.get("fingerprint") != fingerprint(
+        modulePath, installed_modules(modulePath)
+    ):
+        return None
+    return loadPlan
+
+
+def archive(modulePath: str):
+    if os.path.isdir(modulePath):
+        return None
+    try:
+        return zipimport.zipimporter(modulePath)
+    except zipimport.ZipImportError:
+        return None
+
+
+def read_frozen(modulePath: str):
+    importer = archive(modulePath)
+    if importer is None:
+        return None
+    try:
+        loadPlan = json.loads(importer.get_data(os.path.join(modulePath, planFile)))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(loadPlan, dict) or loadPlan.get("version") != planVersion:
+        return None
+    return loadPlan
+
+
+def write(modulePath: str, loadPlan: dict):
+    targetFile = os.path.join(modulePath, planFile)
+    try:
+        with open(targetFile + ".tmp", "w") as f:
+            json.dump(loadPlan, f, ensure_ascii=False)
+        os.replace(targetFile + ".tmp", targetFile)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def invalidate(modulePath: str):
+    try:
+        os.remove(os.path.join(modulePath, planFile))
+    except OSError:
+        pass
+
+
+def refresh(modulePath: str):
+    try:
+        loadPlan = build(modulePath)
+    except Exception:
+        invalidate(modulePath)
+        return None
+    write(modulePath, loadPlan)
+    return loadPlan
@@ -0,0 +1,66 @@
+import os
+import json
+import hashlib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+zipTimestamp = (1980, 1, 1, 0, 0, 0)
+
+
+def zip_entries(src_dir: str) -> list[tuple[str, str]]:
+    base_dir = os.path.normpath(src_dir)
+    main_folder = os.path.basename(base_dir)
+    entries = []
+    for root, dirs, files in os.walk(base_dir):
+        dirs[:] = sorted(
+            d for d in dirs if d != "__pycache__" and not d.startswith(".")
+        )
+        for file in sorted(f for f in files if not f.startswith(".")):
+            file_path = os.path.join(root, file)
+            arcname = os.path.join(main_folder, os.path.relpath(file_path, base_dir))
+            entries.append((file_path, arcname.replace(os.sep, "/")))
+    return entries
+
+
+def tree_hash(src_dir: str) -> str:
+    digest = hashlib.sha256()
+    for file_path, arcname in zip_entries(src_dir):
+        digest.update(arcname.encode() + b"\0")
+        with open(file_path, "rb") as f:
+            digest.update(hashlib.file_digest(f, "sha256").digest())
+    return digest.hexdigest()
+
+
+def zip_dir(src_dir: str, dst_zip: str) -> str:
+    with zipfile.ZipFile(dst_zip + ".tmp", "w", zipfile.ZIP_DEFLATED) as zipf:
+        for file_path, arcname in zip_entries(src_dir):
+            info = zipfile.ZipInfo(arcname, date_time=zipTimestamp)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with open(file_path, "rb") as f:
+                zipf.writestr(info, f.read())
+    os.replace(dst_zip + ".tmp", dst_zip)
+    with open(dst_zip, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def build_zips(jobs: dict[str, tuple[str, str]]) -> dict[str, str]:
+    if len(jobs) <= 1:
+        return {module: zip_dir(*job) for module, job in jobs.items()}
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        futures = {module: pool.submit(zip_dir, *job) for module, job in jobs.items()}
+        return {module: future.result() for module, future in futures.items()}
+
+
+def read_state(stateFile: str) -> dict:
+    try:
+        with open(stateFile, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_state(stateFile: str, state: dict):
+    with open(stateFile + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(stateFile + ".tmp", stateFile)
@@ -0,0 +1,131 @@
+import os
+import json
+
+phases = ("import", "construct", "install")
+
+
+def new_timing() -> dict:
+    return {
+        "import": 0.0,
+        "construct": 0.0,
+        "install": 0.0,
+        "wait": 0.0,
+        "start": None,
+        "end": None,
+        "spans": [],
+    }
+
+
+class LoadReport:
+    def __init__(self, moduleLoader):
+        self.loader = moduleLoader
+
+    @property
+    def modules(self) -> dict[str, dict]:
+        result = {}
+        for package, timing in self.loader.profile.items():
+            if timing["end"] is None:
+                continue
+            result[package] = {
+                "name": self.loader.infos[package]["name"],
+                "import": timing["import"],
+                "construct": timing["construct"],
+                "install": timing["install"],
+                "wait": timing["wait"],
+                "total": sum(timing[phase] for phase in phases),
+                "start": timing["start"],
+                "end": timing["end"],
+            }
+        return result
+
+    @property
+    def total(self) -> float:
+        ends = [x["end"] for x in self.modules.values()]
+        return max(ends) if ends else 0.0
+
+    def critical_path(self) -> tuple[list[str], float]:
+        modules = self.modules
+        finish: dict[str, float] = {}
+        previous: dict[str, str | None] = {}
+        for package in self.loader.order:
+            if package not in modules:
+                continue
+            deps = [d for d in self.loader.dependencies[package] if d in finish]
+            slowest = max(deps, key=lambda d: finish[d], default=None)
+            previous[package] = slowest
+            finish[package] = modules[package]["total"] + (
+                finish[slowest] if slowest else 0.0
+            )
+        if not finish:
+            return [], 0.0
+        package = max(finish, key=lambda x: finish[x])
+        length = finish[package]
+        path = []
+        while package is not None:
+            path.append(package)
+            package = previous[package]
+        return path[::-1], length
+
+    def rows(self, sort: str = "total") -> list[dict]:
+        return sorted(
+            ({"package": k, **v} for k, v in self.modules.items()),
+            key=lambda x: x[sort],
+            reverse=True,
+        )
+
+    def table(self, sort: str = "total") -> str:
+        lines = [
+            "{:<32} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+                "Module", "Import", "Main", "Install", "Wait", "Total"
+            )
+        ]
+        for row in self.rows(sort):
+            lines.append(
+                "{:<32} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f}".format(
+                    row["package"],
+                    *(
+                        row[x] * 1000
+                        for x in ("import", "construct", "install", "wait", "total")
+                    ),
+                )
+            )
+        path, length = self.critical_path()
+        lines.append("")
+        lines.append(
+            f"Loaded {len(self.modules)} modules in {self.total * 1000:.2f} ms"
+        )
+        lines.append(f"Critical path ({length * 1000:.2f} ms): {' -> '.join(path)}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        path, length = self.critical_path()
+        return {
+            "total": self.total,
+            "modules": self.modules,
+            "criticalPath": path,
+            "criticalTime": length,
+        }
+
+    def trace_events(self) -> list[dict]:
+        events = []
+        threads: dict[int, int] = {}
+        for package, timing in self.loader.profile.items():
+            for phase, start, duration, thread in timing["spans"]:
+                events.append(
+                    {
+                        "name": f"{package} {phase}",
+                        "cat": phase,
+                        "ph": "X",
+                        "ts": start * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threads.setdefault(thread, len(threads)),
+                        "args": {"module": self.loader.infos[package]["name"]},
+                    }
+                )
+        return sorted(events, key=lambda x: x["ts"])
+
+    def write_trace(self, traceFile: str):
+        with open(traceFile + ".tmp", "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        os.replace(traceFile + ".tmp", traceFile)
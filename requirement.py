@@ -0,0 +1,66 @@
+import re
+
+from . import errors
+
+namePattern = re.compile(r"^\s*([A-Za-z0-9_.\-]+)\s*(.*?)\s*$")
+constraintPattern = re.compile(r"^(==|!=|>=|<=|>|<)\s*([0-9]+(?:\.[0-9]+)*)$")
+operators = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+}
+
+
+def version_tuple(version: str) -> tuple[int, ...]:
+    parts = [int(x) for x in str(version).split(".")]
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+def parse(spec) -> list[tuple[str, list[tuple[str, str]]]]:
+    alternatives = spec if isinstance(spec, list) else spec.split("|")
+    result = []
+    for alternative in alternatives:
+        match = namePattern.match(alternative)
+        if match is None or not match.group(1):
+            raise errors.InvalidDependencyError(f"Invalid dependency {spec}")
+        name, rest = match.groups()
+        constraints = []
+        for part in rest.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            constraint = constraintPattern.match(part)
+            if constraint is None:
+                raise errors.InvalidDependencyError(
+                    f"Invalid version constraint {part} in {spec}"
+                )
+            constraints.append(constraint.groups())
+        result.append((name.removeprefix("m_"), constraints))
+    return result
+
+
+def satisfies(version: str, constraints: list[tuple[str, str]]) -> bool:
+    try:
+        current = version_tuple(version)
+        return all(operators[op](current, version_tuple(x)) for op, x in constraints)
+    except ValueError:
+        return not constraints
+
+
+def describe(name: str, constraints: list[tuple[str, str]]) -> str:
+    return name + ",".join(op + version for op, version in constraints)
+
+
+def installed_alternative(spec, moduleInfos: dict[str, dict]) -> str | None:
+    for name, constraints in parse(spec):
+        package = "m_" + name
+        if package in moduleInfos and satisfies(
+            moduleInfos[package].get("version", "0"), constraints
+        ):
+            return package
+    return None
@@ -0,0 +1,148 @@
+from . import util
+from . import errors
+from . import requirement
+
+
+class Resolver:
+    def __init__(self, moduleCatalog, installed: dict[str, dict], optional=False):
+        self.catalog = moduleCatalog
+        self.installed = installed
+        self.optional = optional
+
+    def _candidates(self, name: str, constraints: list, pinned, provider):
+        keys = [pinned] if pinned else list(self.catalog.candidates(name).keys())
+        found = []
+        for key in keys:
+            version = self.catalog.module(key)["version"]
+            if requirement.satisfies(version, constraints):
+                found.append((key, version))
+        found.sort(key=lambda x: requirement.version_tuple(x[1]), reverse=True)
+        found.sort(key=lambda x: x[0].split("@")[-1] != provider)
+        return found
+
+    def _breaks(self, name: str, version: str, selected: dict) -> list[str]:
+        broken = []
+        for dependent, moduleInfo in self.installed.items():
+            if dependent in selected and selected[dependent]["action"] != "keep":
+                continue
+            for spec in moduleInfo.get("dependencies", []):
+                alternatives = requirement.parse(spec)
+                if name not in [x for x, _ in alternatives]:
+                    continue
+                if not any(
+                    (
+                        requirement.satisfies(version, constraints)
+                        if alternative == name
+                        else alternative in self.installed
+                        and requirement.satisfies(
+                            self.installed[alternative].get("version", "0"), constraints
+                        )
+                    )
+                    for alternative, constraints in alternatives
+                ):
+                    broken.append(f"{dependent} requires {spec}")
+        return broken
+
+    def _requirements(self, key: str, moduleContent: dict) -> list[tuple]:
+        pending = []
+        for spec in moduleContent.get("dependencies", []):
+            pending.append((requirement.parse(spec), key, False))
+        if self.optional:
+            for spec in moduleContent.get("optional_dependencies", []):
+                pending.append((requirement.parse(spec), key, True))
+        return pending
+
+    def _choices(self, name, constraints, pinned, requiredBy, selected):
+        wanted = requirement.describe(name, constraints)
+        if name in selected:
+            current = selected[name]
+            if requirement.satisfies(current["version"], constraints) and (
+                pinned is None or pinned == current["key"]
+            ):
+                chosen = {**current, "requiredBy": current["requiredBy"] + [requiredBy]}
+                return [({**selected, name: chosen}, [])], None
+            return [], (
+                f"{wanted} required by {requiredBy} conflicts with "
+                f"{current['key'] or name} {current['version']} required by "
+                f"{', '.join(str(x) for x in current['requiredBy'])}"
+            )
+        if (
+            pinned is None
+            and name in self.installed
+            and requirement.satisfies(self.installed[name]["version"], constraints)
+        ):
+            kept = {
+                "name": name,
+                "key": None,
+                "version": self.installed[name]["version"],
+                "action": "keep",
+                "requiredBy": [requiredBy],
+                "dependencies": [],
+            }
+            return [({**selected, name: kept}, [])], None
+        provider = requiredBy.split("@")[-1] if requiredBy else None
+        choices = []
+        failures = []
+        for key, version in self._candidates(name, constraints, pinned, provider):
+            broken = self._breaks(name, version, selected)
+            if name in self.installed and broken:
+                failures.append(f"{key} {version} would break {', '.join(broken)}")
+                continue
+            moduleContent = self.catalog.module(key)
+            pending = self._requirements(key, moduleContent)
+            chosen = {
+                "name": name,
+                "key": key,
+                "version": version,
+                "action": "upgrade" if name in self.installed else "install",
+                "requiredBy": [requiredBy],
+                "dependencies": [
+                    alternative
+                    for alternatives, _, optional in pending
+                    if not optional
+                    for alternative, _ in alternatives
+                ],
+            }
+            choices.append(({**selected, name: chosen}, pending))
+        if not choices:
+            return [], "; ".join(failures) or (
+                f"No module satisfies {wanted} required by {requiredBy}"
+            )
+        return choices, None
+
+    def _solve(self, pending: list[tuple], selected: dict) -> dict:
+        if not pending:
+            return selected
+        (alternatives, requiredBy, optional), rest = pending[0], pending[1:]
+        if optional and any(name in selected for name, *_ in alternatives):
+            return self._solve(rest, selected)
+        failures = []
+        for name, constraints, *pinned in alternatives:
+            choices, failure = self._choices(
+                name, constraints, pinned[0] if pinned else None, requiredBy, selected
+            )
+            if failure:
+                failures.append(failure)
+            for nextSelected, requirements in choices:
+                try:
+                    return self._solve(requirements + rest, nextSelected)
+                except errors.ResolutionError as e:
+                    failures.append(e.message)
+        if optional:
+            return self._solve(rest, selected)
+        raise errors.ResolutionError("; ".join(dict.fromkeys(failures)))
+
+    def resolve(self, targets: list[str]) -> list[dict]:
+        pending = []
+        for key in targets:
+            pending.append(([(key.split("@")[0], [], key)], None, False))
+        selected = self._solve(pending, {})
+        order = util.topological_sort(
+            list(selected),
+            {
+                name: [x for x in entry["dependencies"] if x in selected]
+                for name, entry in selected.items()
+            },
+            errors.CycleDependencyError,
+        )
+        return [selected[name] for name in order]
@@ -0,0 +1,357 @@
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import Future
+
+from . import errors
+
+policies = ("block", "abort", "discard", "caller_runs")
+
+
+class Task:
+    def __init__(self, fn, args, kwargs, priority: int, due: float):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.due = due
+        self.future = Future()
+
+
+class PeriodicTask:
+    def __init__(self, pool, fn, args, kwargs, priority: int, next_run):
+        self.pool = pool
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.next_run = next_run
+        self.cancelled = False
+        self.runs = 0
+        self.future = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def _schedule(self, due: float):
+        if self.cancelled:
+            return
+        try:
+            self.future = self.pool._enqueue(
+                Task(self._run, (due,), {}, self.priority, due), force=True
+            )
+        except errors.RejectedTaskError:
+            self.cancelled = True
+
+    def _run(self, due: float):
+        try:
+            return self.fn(*self.args, **self.kwargs)
+        finally:
+            self.runs += 1
+            self._schedule(self.next_run(due))
+
+
+class Pool:
+    def __init__(
+        self, name: str, workers: int = 4, maxQueue: int = 0, policy: str = "block"
+    ):
+        if policy not in policies:
+            raise ValueError(f"Unknown rejection policy {policy}")
+        self.name = name
+        self.workers = workers
+        self.maxQueue = maxQueue
+        self.policy = policy
+        self.threads: list[threading.Thread] = []
+        self._ready: list = []
+        self._delayed: list = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "waitTime": 0.0,
+            "maxWaitTime": 0.0,
+            "runTime": 0.0,
+            "maxRunTime": 0.0,
+        }
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._ready) + len(self._delayed)
+
+    def _start(self):
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"sdk-{self.name}-{len(self.threads)}",
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def _full(self) -> bool:
+        return bool(self.maxQueue) and (
+            len(self._ready) + len(self._delayed) >= self.maxQueue
+        )
+
+    def _enqueue(self, task: Task, force: bool = False) -> Future:
+        with self._cond:
+            if self._closing:
+                raise errors.RejectedTaskError(f"Pool {self.name} is shut down")
+            full = not force and self._full()
+            while full and self.policy == "block":
+                self._cond.wait()
+                if self._closing:
+                    raise errors.RejectedTaskError(f"Pool {self.name} is shut down")
+                full = self._full()
+            if not full:
+                self._stats["submitted"] += 1
+                entry = (task.due, -task.priority, next(self._seq), task)
+                if task.due > time.monotonic():
+                    heapq.heappush(self._delayed, entry)
+                else:
+                    heapq.heappush(self._ready, entry[1:])
+                self._start()
+                self._cond.notify_all()
+                return task.future
+            self._stats["rejected"] += 1
+            if self.policy == "abort":
+                raise errors.RejectedTaskError(f"Pool {self.name} queue is full")
+            if self.policy == "discard":
+                task.future.cancel()
+                return task.future
+        self._execute(task, time.monotonic())
+        return task.future
+
+    def _promote(self):
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            entry = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, entry[1:])
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while True:
+                    self._promote()
+                    if self._ready:
+                        _, _, task = heapq.heappop(self._ready)
+                        self._cond.notify_all()
+                        break
+                    if self._closing and not self._delayed:
+                        return
+                    timeout = None
+                    if self._delayed:
+                        timeout = max(0, self._delayed[0][0] - time.monotonic())
+                    self._cond.wait(timeout)
+            self._execute(task, task.due)
+
+    def _execute(self, task: Task, readyAt: float):
+        if not task.future.set_running_or_notify_cancel():
+            return
+        started = time.monotonic()
+        try:
+            result = task.fn(*task.args, **task.kwargs)
+        except BaseException as e:
+            task.future.set_exception(e)
+            failed = 1
+        else:
+            task.future.set_result(result)
+            failed = 0
+        finished = time.monotonic()
+        waited = max(0.0, started - readyAt)
+        with self._cond:
+            self._stats["completed"] += 1
+            self._stats["failed"] += failed
+            self._stats["waitTime"] += waited
+            self._stats["maxWaitTime"] = max(self._stats["maxWaitTime"], waited)
+            self._stats["runTime"] += finished - started
+            self._stats["maxRunTime"] = max(
+                self._stats["maxRunTime"], finished - started
+            )
+
+    def schedule(
+        self, fn, args=(), kwargs=None, priority: int = 0, delay: float = 0
+    ) -> Future:
+        task = Task(fn, args, kwargs or {}, priority, time.monotonic() + delay)
+        return self._enqueue(task)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return self.schedule(fn, args, kwargs)
+
+    def every(
+        self,
+        interval: float,
+        fn,
+        args=(),
+        kwargs=None,
+        priority: int = 0,
+        delay: float | None = None,
+    ) -> PeriodicTask:
+        periodic = PeriodicTask(
+            self, fn, args, kwargs or {}, priority, lambda due: due + interval
+        )
+        periodic._schedule(time.monotonic() + (interval if delay is None else delay))
+        return periodic
+
+    def cron(
+        self, expression: str, fn, args=(), kwargs=None, priority: int = 0
+    ) -> PeriodicTask:
+        def next_run(due: float) -> float:
+            now = datetime.now()
+            return time.monotonic() + (cron_next(expression, now) - now).total_seconds()
+
+        periodic = PeriodicTask(self, fn, args, kwargs or {}, priority, next_run)
+        periodic._schedule(next_run(time.monotonic()))
+        return periodic
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["depth"] = len(self._ready) + len(self._delayed)
+            stats["ready"] = len(self._ready)
+            stats["delayed"] = len(self._delayed)
+        completed = stats["completed"] or 1
+        stats["avgWaitTime"] = stats["waitTime"] / completed
+        stats["avgRunTime"] = stats["runTime"] / completed
+        return stats
+
+    def shutdown(self, wait: bool = True, timeout: float | None = None, cancel=False):
+        with self._cond:
+            self._closing = True
+            dropped = []
+            if cancel:
+                dropped = [x[-1] for x in self._ready + self._delayed]
+                self._ready, self._delayed = [], []
+            else:
+                dropped = [x[-1] for x in self._delayed]
+                self._delayed = []
+            self._cond.notify_all()
+        for task in dropped:
+            task.future.cancel()
+        if not wait:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(
+                None if deadline is None else max(0, deadline - time.monotonic())
+            )
+        return not any(thread.is_alive() for thread in self.threads)
+
+
+class Scheduler:
+    def __init__(self, workers: int = 4, maxQueue: int = 0, policy: str = "block"):
+        self.workers = workers
+        self.maxQueue = maxQueue
+        self.policy = policy
+        self.pools: dict[str, Pool] = {}
+        self._lock = threading.Lock()
+
+    def pool(
+        self,
+        name: str = "default",
+        workers: int | None = None,
+        maxQueue: int | None = None,
+        policy: str | None = None,
+    ) -> Pool:
+        with self._lock:
+            if name not in self.pools:
+                self.pools[name] = Pool(
+                    name,
+                    self.workers if workers is None else workers,
+                    self.maxQueue if maxQueue is None else maxQueue,
+                    self.policy if policy is None else policy,
+                )
+            return self.pools[name]
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return self.pool().submit(fn, *args, **kwargs)
+
+    def schedule(self, fn, args=(), kwargs=None, priority: int = 0, delay: float = 0):
+        return self.pool().schedule(fn, args, kwargs, priority, delay)
+
+    def every(self, interval: float, fn, args=(), kwargs=None, priority: int = 0):
+        return self.pool().every(interval, fn, args, kwargs, priority)
+
+    def cron(self, expression: str, fn, args=(), kwargs=None, priority: int = 0):
+        return self.pool().cron(expression, fn, args, kwargs, priority)
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            pools = dict(self.pools)
+        return {name: pool.stats() for name, pool in pools.items()}
+
+    def shutdown(self, wait: bool = True, timeout: float | None = None, cancel=False):
+        with self._lock:
+            pools = list(self.pools.values())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        drained = True
+        for pool in pools:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.monotonic())
+            drained = pool.shutdown(wait, remaining, cancel) and drained
+        return drained
+
+
+def _cron_field(field: str, low: int, high: int) -> set[int]:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-"))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def cron_next(expression: str, after: datetime) -> datetime:
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Invalid cron expression {expression}")
+    minutes = _cron_field(fields[0], 0, 59)
+    hours = _cron_field(fields[1], 0, 23)
+    days = _cron_field(fields[2], 1, 31)
+    months = _cron_field(fields[3], 1, 12)
+    weekdays = {x % 7 for x in _cron_field(fields[4], 0, 7)}
+    anyDay, anyWeekday = fields[2] == "*", fields[4] == "*"
+    current = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = current + timedelta(days=366 * 5)
+    while current < limit:
+        if current.month not in months:
+            month = current.month % 12 + 1
+            year = current.year + (current.month == 12)
+            current = current.replace(year=year, month=month, day=1, hour=0, minute=0)
+            continue
+        dayMatch = current.day in days
+        weekdayMatch = (current.weekday() + 1) % 7 in weekdays
+        if anyDay or anyWeekday:
+            matched = dayMatch and weekdayMatch
+        else:
+            matched = dayMatch or weekdayMatch
+        if not matched:
+            current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+            continue
+        if current.hour not in hours:
+            current = (current + timedelta(hours=1)).replace(minute=0)
+            continue
+        if current.minute not in minutes:
+            current += timedelta(minutes=1)
+            continue
+        return current
+    raise ValueError(f"Cron expression {expression} never matches")
@@ -1,8 +1,19 @@
 from collections import defaultdict, deque
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import logger
+from .scheduler import Scheduler
 
 executor = ThreadPoolExecutor()
+scheduler = Scheduler()
+
+
+def restart():
+    global executor, scheduler
+    executor = ThreadPoolExecutor()
+    scheduler = Scheduler()
 
 
 def topological_sort(elements, dependencies, error):
@@ -26,6 +37,120 @@ def topological_sort(elements, dependencies, error):
     return sorted_list
 
 
+def topological_levels(elements, dependencies, error):
+    graph = defaultdict(list)
+    in_degree = {element: 0 for element in elements}
+    for element, deps in dependencies.items():
+        for dep in deps:
+            graph[dep].append(element)
+            in_degree[element] += 1
+    level = sorted(element for element in elements if in_degree[element] == 0)
+    levels = []
+    while level:
+        levels.append(level)
+        next_level = []
+        for node in level:
+            for neighbor in graph[node]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    next_level.append(neighbor)
+        level = sorted(next_level)
+    if sum(len(level) for level in levels) != len(elements):
+        raise error(f"Cycle detected in the dependencies: {elements} -> {dependencies}")
+    return levels
+
+
+class AsyncRuntime:
+    def __init__(self, loops: int = 1, maxInFlight: int = 1024):
+        self.loopCount = loops
+        self.maxInFlight = maxInFlight
+        self.loops: list[asyncio.AbstractEventLoop] = []
+        self.threads: list[threading.Thread] = []
+        self.futures: set[Future] = set()
+        self._next = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxInFlight)
+        self._logger = None
+
+    def _start(self):
+        with self._lock:
+            if self.loops:
+                return
+            for i in range(self.loopCount):
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=f"sdk-async-{i}", daemon=True
+                )
+                thread.start()
+                self.loops.append(loop)
+                self.threads.append(thread)
+
+    def _pick(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            loop = self.loops[self._next % len(self.loops)]
+            self._next += 1
+            return loop
+
+    def _done(self, future: Future, taskLogger):
+        self._slots.release()
+        with self._lock:
+            self.futures.discard(future)
+        if future.cancelled() or future.exception() is None:
+            return
+        if taskLogger is None:
+            if self._logger is None:
+                self._logger = logger.Logger("Async")
+            taskLogger = self._logger
+        taskLogger.error(f"Async task failed: {future.exception()!r}")
+
+    def submit(self, coroutine, logger=None, timeout: float | None = None) -> Future:
+        if not self._slots.acquire(timeout=timeout):
+            coroutine.close()
+            raise RuntimeError(f"Async runtime has {self.maxInFlight} tasks in flight")
+        try:
+            self._start()
+            future = asyncio.run_coroutine_threadsafe(coroutine, self._pick())
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.futures.add(future)
+        future.add_done_callback(lambda x: self._done(x, logger))
+        return future
+
+    def run(self, async_func, *args, **kwargs) -> Future:
+        return self.submit(async_func(*args, **kwargs))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self.futures)
+
+    def in_loop(self) -> bool:
+        with self._lock:
+            return threading.current_thread() in self.threads
+
+    def cancel_all(self):
+        with self._lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.cancel()
+
+    def shutdown(self, cancel: bool = True, timeout: float | None = None):
+        if cancel:
+            self.cancel_all()
+        with self._lock:
+            loops, threads = self.loops, self.threads
+            self.loops, self.threads = [], []
+        for loop in loops:
+            loop.call_soon_threadsafe(loop.stop)
+        for loop, thread in zip(loops, threads):
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+
+
+runtime = AsyncRuntime()
+
+
 def ExecAsync(async_func, *args, **kwargs):
-    loop = asyncio.get_event_loop()
-    loop.run_in_executor(executor, lambda: asyncio.run(async_func(*args, **kwargs)))
+    return runtime.run(async_func, *args, **kwargs)